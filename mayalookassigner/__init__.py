@@ -1,9 +1,43 @@
-from .app import (
-    App,
-    show
-)
+import sys
+import types
+
+
+def show():
+    """Display the Look Manager, see `app.show`
+
+    The interface is imported on first use so the other modules of the
+    package, e.g. `rules`, can be used without Maya, avalon or Qt.
+
+    """
+    from . import app
+    return app.show()
+
+
+class _Package(types.ModuleType):
+    """The package module which imports the interface on first use of `App`
+
+    Modules can only define `__getattr__` since Python 3.7, so the package
+    is replaced in `sys.modules` by this module to support Python 2 too.
+
+    """
+
+    def __getattr__(self, name):
+        if name == "App":
+            from .app import App
+            return App
+        raise AttributeError("module %r has no attribute %r" % (self.__name__,
+                                                                name))
 
 
 __all__ = [
     "App",
     "show"]
+
+
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+
+# The functions above keep using the globals of the original module, so
+# keep it alive with the package
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
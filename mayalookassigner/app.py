@@ -1,21 +1,28 @@
+import os
 import sys
 import time
 import logging
 
-import colorbleed.maya.lib as cblib
-
-from avalon import style, io
+from avalon import style
 from avalon.tools import lib
 from avalon.vendor.Qt import QtWidgets, QtCore
 
 from maya import cmds
-import maya.OpenMaya                # old api for MFileIO
-import maya.api.OpenMaya as om
 
+from . import jobs
+from . import lazy
+from . import rules
+from . import snapshot
 from . import widgets
+from . import catalog
 from . import commands
+from . import instrumentation
 from .version import version
 
+api = lazy.LazyModule("avalon.api")
+OpenMaya = lazy.LazyModule("maya.OpenMaya")  # old api for MFileIO
+om = lazy.LazyModule("maya.api.OpenMaya")
+
 module = sys.modules[__name__]
 module.window = None
 
@@ -30,20 +37,22 @@ class App(QtWidgets.QWidget):
         # Store callback references
         self._callbacks = []
 
-        filename = commands.get_workfile()
+        # The running assignment job
+        self._job = None
+        self._job_transaction = False
+
+        # Seconds per assigned asset of each run by transaction mode
+        self._timings = {True: [], False: []}
+
+        # The scene the listed assets belong to
+        self._scene = None
 
         self.setObjectName("lookManager")
-        self.setWindowTitle("Look Manager {version} - [{filename}]".format(
-            version=version,
-            filename=filename
-        ))
         self.setWindowFlags(QtCore.Qt.Window)
         self.setParent(parent)
 
-        # Force to delete the window on close so it triggers
-        # closeEvent only once. Otherwise it's retriggered when
-        # the widget gets garbage collected.
-        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        # The window is not deleted on close but hidden so `show()` can
+        # reuse it, it is kept alive by the module's reference.
 
         self.resize(750, 500)
 
@@ -51,8 +60,9 @@ class App(QtWidgets.QWidget):
 
         self.setup_connections()
 
-        # Force refresh check on initialization
-        self._on_renderlayer_switch()
+        self.refresh_title()
+
+        self.register_callbacks()
 
     def setup_ui(self):
         """Build the UI"""
@@ -70,9 +80,44 @@ class App(QtWidgets.QWidget):
         assign_selected.setToolTip("Whether to assign only to selected nodes "
                                    "or to the full asset")
         remove_unused_btn = QtWidgets.QPushButton("Remove Unused Looks")
+        assign_rules_btn = QtWidgets.QPushButton("Assign By Rules")
+        assign_rules_btn.setToolTip("Assign looks to all assets using the "
+                                    "project's assignment rules")
+
+        use_catalog = QtWidgets.QCheckBox("Use offline catalog")
+        use_catalog.setToolTip("Read assets and looks from a local catalog "
+                               "instead of the database")
+        sync_catalog_btn = QtWidgets.QPushButton("Sync")
+        sync_catalog_btn.setToolTip("Fetch the assets and looks published "
+                                    "since the last sync")
+        sync_catalog_btn.setEnabled(False)
+        catalog_layout = QtWidgets.QHBoxLayout()
+        catalog_layout.addWidget(use_catalog)
+        catalog_layout.addWidget(sync_catalog_btn)
 
         looks_layout.addWidget(look_outliner)
+        transaction = QtWidgets.QCheckBox("Transaction mode")
+        transaction.setToolTip("Suspend the viewport refresh while assigning "
+                               "and undo all assignments at once.\n"
+                               "Anything done in Maya during the assignment "
+                               "becomes part of that same undo.")
+        transaction.setChecked(False)
+
         looks_layout.addWidget(assign_selected)
+        looks_layout.addWidget(transaction)
+        looks_layout.addLayout(catalog_layout)
+        save_snapshot_btn = QtWidgets.QPushButton("Save Snapshot..")
+        save_snapshot_btn.setToolTip("Save the look assignments of the scene "
+                                     "to a file")
+        replay_snapshot_btn = QtWidgets.QPushButton("Replay Snapshot..")
+        replay_snapshot_btn.setToolTip("Re-apply saved look assignments to "
+                                       "the loaded looks")
+        snapshot_layout = QtWidgets.QHBoxLayout()
+        snapshot_layout.addWidget(save_snapshot_btn)
+        snapshot_layout.addWidget(replay_snapshot_btn)
+
+        looks_layout.addWidget(assign_rules_btn)
+        looks_layout.addLayout(snapshot_layout)
         looks_layout.addWidget(remove_unused_btn)
 
         # Footer
@@ -85,9 +130,20 @@ class App(QtWidgets.QWidget):
         warn_layer.setStyleSheet("color: #DD5555; font-weight: bold;")
         warn_layer.setFixedHeight(25)
 
+        progress = QtWidgets.QProgressBar()
+        progress.setFixedHeight(20)
+        progress.setMaximumWidth(200)
+        progress.hide()
+        cancel_job_btn = QtWidgets.QPushButton("Cancel")
+        cancel_job_btn.setFixedHeight(20)
+        cancel_job_btn.setToolTip("Stop assigning after the current asset")
+        cancel_job_btn.hide()
+
         footer = QtWidgets.QHBoxLayout()
         footer.setContentsMargins(0, 0, 0, 0)
         footer.addWidget(status)
+        footer.addWidget(progress)
+        footer.addWidget(cancel_job_btn)
         footer.addWidget(warn_layer)
 
         # Build up widgets
@@ -109,11 +165,19 @@ class App(QtWidgets.QWidget):
         self.asset_outliner = asset_outliner
         self.look_outliner = look_outliner
         self.status = status
+        self.progress = progress
         self.warn_layer = warn_layer
 
         # Buttons
         self.remove_unused = remove_unused_btn
+        self.assign_rules = assign_rules_btn
+        self.save_snapshot = save_snapshot_btn
+        self.replay_snapshot = replay_snapshot_btn
         self.assign_selected = assign_selected
+        self.transaction = transaction
+        self.use_catalog = use_catalog
+        self.sync_catalog = sync_catalog_btn
+        self.cancel_job = cancel_job_btn
 
     def setup_connections(self):
         """Connect interactive widgets with actions"""
@@ -126,6 +190,17 @@ class App(QtWidgets.QWidget):
 
         self.look_outliner.menu_apply_action.connect(self.on_process_selected)
         self.remove_unused.clicked.connect(commands.remove_unused_looks)
+        self.assign_rules.clicked.connect(self.on_assign_by_rules)
+        self.save_snapshot.clicked.connect(self.on_save_snapshot)
+        self.replay_snapshot.clicked.connect(self.on_replay_snapshot)
+        self.use_catalog.toggled.connect(self.on_use_catalog_toggled)
+        self.sync_catalog.clicked.connect(self.on_sync_catalog)
+        self.cancel_job.clicked.connect(self.on_cancel_job)
+
+    def register_callbacks(self):
+        """Register the Maya callbacks, these are removed on close"""
+
+        self.deregister_callbacks()
 
         # Maya renderlayer switch callback
         callback = om.MEventMessage.addEventCallback(
@@ -134,18 +209,90 @@ class App(QtWidgets.QWidget):
         )
         self._callbacks.append(callback)
 
-    def closeEvent(self, event):
+        # Stop a running assignment before another scene is opened, it
+        # would otherwise continue on the nodes of the previous scene
+        for message in (om.MSceneMessage.kBeforeOpen,
+                        om.MSceneMessage.kBeforeNew):
+            callback = om.MSceneMessage.addCallback(message,
+                                                    self._stop_job)
+            self._callbacks.append(callback)
+
+        # Clear the listed assets when another scene is opened
+        for message in (om.MSceneMessage.kAfterOpen,
+                        om.MSceneMessage.kAfterNew):
+            callback = om.MSceneMessage.addCallback(message,
+                                                    self._on_scene_changed)
+            self._callbacks.append(callback)
+
+        # Force refresh check as the layer might have changed meanwhile
+        self._on_renderlayer_switch()
 
-        # Delete callbacks
+    def deregister_callbacks(self):
         for callback in self._callbacks:
             om.MMessage.removeCallback(callback)
+        self._callbacks = []
+
+    def reopen(self):
+        """Prepare the hidden window to be shown again
+
+        Scene changes are not tracked while the window is hidden, so the
+        listed assets are only kept when the same saved scene is open.
+
+        """
+
+        scene = cmds.file(query=True, sceneName=True)
+        if not scene or scene != self._scene:
+            self.clear()
+
+        self.register_callbacks()
+        self.refresh_title()
+
+    def clear(self):
+        self.asset_outliner.clear()
+        self.look_outliner.clear()
+
+    def _stop_job(self, *args):
+        """Stop the running assignment right away"""
+
+        # Stopping closes the transaction of the job as well
+        if self._job is not None:
+            self._job.stop()
+
+    def _on_scene_changed(self, *args):
+        """Callback that clears the assets of the previous scene"""
+        self._stop_job()
+        self.clear()
+
+        # The followed selection refers to nodes of the previous scene
+        self.asset_outliner.reset_followed_selection()
+        self.refresh_title()
+
+    def refresh_title(self):
+        """Update the title to the current workfile"""
+
+        self._scene = cmds.file(query=True, sceneName=True)
+        filename = commands.get_workfile()
+
+        self.setWindowTitle("Look Manager {version} - [{filename}]".format(
+            version=version,
+            filename=filename
+        ))
+
+    def closeEvent(self, event):
+
+        # Stop right away so a transaction is not left open
+        self._stop_job()
+
+        self.deregister_callbacks()
+        self.asset_outliner.follow_selection.setChecked(False)
+        self.use_catalog.setChecked(False)
 
         return super(App, self).closeEvent(event)
 
     def _on_renderlayer_switch(self, *args):
         """Callback that updates on Maya renderlayer switch"""
 
-        if maya.OpenMaya.MFileIO.isNewingFile():
+        if OpenMaya.MFileIO.isNewingFile():
             # Don't perform a check during file open or file new as
             # the renderlayers will not be in a valid state yet.
             return
@@ -169,6 +316,85 @@ class App(QtWidgets.QWidget):
         if not found_items:
             self.look_outliner.clear()
 
+    def on_use_catalog_toggled(self, state):
+        """Switch between the local catalog and the database"""
+
+        previous = self.asset_outliner.catalog
+
+        look_catalog = None
+        if state:
+            look_catalog = catalog.Catalog(catalog.get_catalog_path())
+            self._sync_catalog(look_catalog)
+
+        self.asset_outliner.set_catalog(look_catalog)
+        if previous is not None:
+            previous.close()
+
+        self.sync_catalog.setEnabled(state)
+
+    def on_sync_catalog(self):
+        """Update the local catalog with the latest publishes"""
+
+        if self._sync_catalog(self.asset_outliner.catalog):
+            self.asset_outliner.reset_followed_selection()
+
+    def _sync_catalog(self, look_catalog):
+        try:
+            count = look_catalog.sync()
+        except Exception as exc:
+            # Keep working offline with what the catalog has
+            self.log.warning("Unable to sync catalog: %s", exc)
+            self.echo("Unable to sync catalog, working offline..")
+            return False
+
+        self.echo("Synced catalog ({} new documents)".format(count))
+        return True
+
+    def on_save_snapshot(self):
+        """Save the current look assignments to a snapshot file"""
+
+        path = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save Look Snapshot", commands.get_workfolder(),
+            "Look snapshot (*.json)")
+        path = path[0] if isinstance(path, tuple) else path
+        if not path:
+            return
+
+        with instrumentation.operation("save snapshot"):
+            data = snapshot.save(path)
+
+        self.echo("Saved snapshot of {} namespaces".format(
+            len(data["namespaces"])))
+
+    def on_replay_snapshot(self):
+        """Re-apply the look assignments of a snapshot file"""
+
+        path = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Replay Look Snapshot", commands.get_workfolder(),
+            "Look snapshot (*.json)")
+        path = path[0] if isinstance(path, tuple) else path
+        if not path:
+            return
+
+        if self.transaction.isChecked():
+            context = commands.assignment_transaction("Replay look snapshot")
+        else:
+            context = commands.undo_chunk("Replay look snapshot")
+        with context:
+            report = snapshot.load(path)
+
+        message = "Replayed {} looks".format(len(report["applied"]))
+        skipped = (len(report["missing_namespaces"]) +
+                   len(report["missing_looks"]))
+        if skipped:
+            message += ", skipped {} mismatches (see log)".format(skipped)
+        self.echo(message)
+
+    def on_cancel_job(self):
+        if self._job is not None:
+            self.echo("Cancelling..")
+            self._job.cancel()
+
     def on_asset_selection_changed(self):
         """Get selected items from asset loader and fill look outliner"""
 
@@ -179,6 +405,10 @@ class App(QtWidgets.QWidget):
     def on_process_selected(self):
         """Process all selected looks for the selected assets"""
 
+        if self._job is not None and self._job.running:
+            self.echo("Assignment is still running..")
+            return
+
         assets = self.asset_outliner.get_selected_items()
         assert assets, "No asset selected"
 
@@ -189,63 +419,201 @@ class App(QtWidgets.QWidget):
         selection = self.assign_selected.isChecked()
         asset_nodes = self.asset_outliner.get_nodes(selection=selection)
 
-        start = time.time()
-        for i, (asset, item) in enumerate(asset_nodes.items()):
+        items = [(asset, item, looks) for asset, item in asset_nodes.items()]
+        self._start_job("Assign looks", items, self._assign_look)
+
+    def on_assign_by_rules(self):
+        """Assign looks to all assets in the scene by the project's rules"""
+
+        if self._job is not None and self._job.running:
+            self.echo("Assignment is still running..")
+            return
+
+        path = rules.get_rules_path(api.Session["AVALON_PROJECT"])
+        if not os.path.exists(path):
+            self.echo("No assignment rules found: {}".format(path))
+            return
+        ruleset = rules.RuleSet.load(path)
+
+        with instrumentation.operation("plan rules"):
+            nodes = commands.get_all_asset_nodes()
+            assets = commands.create_items_per_namespace(
+                nodes, catalog=self.asset_outliner.catalog)
+
+        plan = ruleset.plan(assets)
+        if not plan:
+            self.echo("No rules match the assets in the scene")
+            return
+
+        self._start_job("Assign looks by rules", plan,
+                        self._assign_plan_entry)
+
+    def _start_job(self, name, items, process):
+        """Run the assignment of `items` as a chunked job"""
+
+        contexts = [instrumentation.operation(name.lower())]
+        self._job_transaction = self.transaction.isChecked()
+        if self._job_transaction:
+            contexts.append(commands.assignment_transaction(name))
+
+        job = jobs.ChunkedJob(name,
+                              items=items,
+                              process=process,
+                              contexts=contexts,
+                              parent=self)
+        job.progressed.connect(self.on_job_progressed)
+        job.finished.connect(self.on_job_finished)
+
+        self.progress.setRange(0, len(items))
+        self.progress.setValue(0)
+        self.progress.show()
+        self.cancel_job.show()
+        self._set_actions_enabled(False)
+
+        self._job = job
+        job.start()
+
+    def _set_actions_enabled(self, state):
+        """Toggle the actions which should not run during a job"""
+        for widget in (self.remove_unused,
+                       self.assign_rules,
+                       self.save_snapshot,
+                       self.replay_snapshot,
+                       self.use_catalog):
+            widget.setEnabled(state)
+        self.sync_catalog.setEnabled(state and self.use_catalog.isChecked())
+        self.asset_outliner.set_refresh_enabled(state)
+
+    def _format_timings(self):
+        """Return the average time per asset with and without transaction"""
+
+        modes = []
+        for mode, label in ((True, "on"), (False, "off")):
+            runs = self._timings[mode]
+            if runs:
+                modes.append("{0} {1:.3f}s/asset ({2} runs)".format(
+                    label, sum(runs) / len(runs), len(runs)))
+            else:
+                modes.append("{0} not measured yet".format(label))
+
+        return "Transaction mode: {}".format(", ".join(modes))
+
+    def _assign_look(self, entry):
+        """Assign the first matching look to the asset
+
+        Args:
+            entry (tuple): asset name, asset item and look subset names
+
+        Returns:
+            str: status message
+
+        """
+        asset, item, looks = entry
+
+        # Assign the first matching look relevant for this asset
+        # (since assigning multiple to the same nodes makes no sense)
+        assign_look = next((subset for subset in item["looks"]
+                           if subset["name"] in looks), None)
+        if not assign_look:
+            return "No matching selected look for {}".format(asset)
+
+        return self._assign_latest_version(asset, assign_look, item["nodes"])
+
+    def _assign_plan_entry(self, entry):
+        """Assign the look of an entry of a rules assignment plan"""
+
+        return self._assign_latest_version(entry["asset"]["name"],
+                                           entry["look"],
+                                           entry["nodes"])
+
+    def _assign_latest_version(self, asset, look, nodes):
+        """Assign the latest version of the look subset to the nodes"""
+
+        version = commands.assign_latest_version(
+            look["_id"],
+            nodes,
+            catalog=self.asset_outliner.catalog
+        )
+        if not version:
+            return "No version found of {} for {}".format(look["name"],
+                                                          asset)
 
-            # Label prefix
-            prefix = "({}/{})".format(i+1, len(asset_nodes))
+        return "Assigned {} to {}".format(look["name"], asset)
 
-            # Assign the first matching look relevant for this asset
-            # (since assigning multiple to the same nodes makes no sense)
-            assign_look = next((subset for subset in item["looks"]
-                               if subset["name"] in looks), None)
-            if not assign_look:
-                self.echo("{} No matching selected "
-                          "look for {}".format(prefix, asset))
-                continue
+    def on_job_progressed(self, done, total, message):
+        self.progress.setValue(done)
+        self.echo("({}/{}) {}".format(done, total, message))
 
-            # Get the latest version of this asset's look subset
-            version = io.find_one({"type": "version",
-                                   "parent": assign_look["_id"]},
-                                  sort=[("name", -1)])
+    def on_job_finished(self, completed):
 
-            subset_name = assign_look["name"]
-            self.echo("{} Assigning {} to {}\t".format(prefix,
-                                                       subset_name,
-                                                       asset))
+        job = self._job
+        self.progress.hide()
+        self.cancel_job.hide()
+        self._set_actions_enabled(True)
+
+        if completed:
+            message = "Finished assigning.."
+        else:
+            message = "Stopped assigning after {}/{} assets..".format(
+                len(job.timings), len(job.items))
 
-            # Assign look
-            cblib.assign_look_by_version(nodes=item["nodes"],
-                                         version_id=version["_id"])
+        if job.timings:
+            slowest, duration = max(job.timings, key=lambda x: x[1])
+            self.log.info("Slowest assignment: %s (%.3fs)",
+                          slowest, duration)
 
-        end = time.time()
+        # Report the timings so transaction mode can be compared
+        self.log.info("Assigned %i assets in %.3fs (transaction mode: %s)",
+                      len(job.timings), job.duration,
+                      "on" if self._job_transaction else "off")
+        if job.timings:
+            runs = self._timings[self._job_transaction]
+            runs.append(job.duration / len(job.timings))
+            self.log.info(self._format_timings())
 
-        self.echo("Finished assigning.. ({0:.3f}s)".format(end - start))
+        self.echo("{0} ({1:.3f}s)".format(message, job.duration))
 
 
 def show():
     """Display Loader GUI
 
+    A hidden window of a previous invocation is reused.
+
     Arguments:
         debug (bool, optional): Run loader in debug-mode,
             defaults to False
 
     """
 
+    start = time.time()
+
     try:
-        module.window.close()
-        del module.window
+        window = module.window
+        window.isVisible()  # raises RuntimeError when already deleted
     except (RuntimeError, AttributeError):
-        pass
-
-    # Get Maya main window
-    top_level_widgets = QtWidgets.QApplication.topLevelWidgets()
-    mainwindow = next(widget for widget in top_level_widgets
-                      if widget.objectName() == "MayaWindow")
+        window = None
 
     with lib.application():
-        window = App(parent=mainwindow)
-        window.setStyleSheet(style.load_stylesheet())
+        if window is None:
+            # Get Maya main window
+            top_level_widgets = QtWidgets.QApplication.topLevelWidgets()
+            mainwindow = next(widget for widget in top_level_widgets
+                              if widget.objectName() == "MayaWindow")
+
+            window = App(parent=mainwindow)
+            window.setStyleSheet(style.load_stylesheet())
+            module.window = window
+            reused = False
+        else:
+            if window.isHidden():
+                window.reopen()
+            else:
+                window.refresh_title()
+            reused = True
+
         window.show()
+        window.raise_()
+        window.activateWindow()
 
-        module.window = window
+    instrumentation.log_timing("show look manager ({})".format(
+        "reused" if reused else "created"), time.time() - start)
@@ -0,0 +1,229 @@
+"""Local catalog of the project's assets, look subsets and versions.
+
+The catalog is a small SQLite file which can be used instead of the
+database to list assets and looks when the database is slow or
+unreachable. It is kept up to date with `Catalog.sync()` which only
+fetches the documents created since the last sync.
+
+Note:
+    Avalon documents carry no modification time so the sync relies on the
+    creation time embedded in the ObjectId. New assets, looks and versions
+    are picked up, renamed documents require a full `Catalog.sync(full=True)`
+    as do documents of a publisher whose clock lags more than `OVERLAP`.
+
+"""
+import os
+import time
+import datetime
+import shutil
+import logging
+import sqlite3
+
+from . import lazy
+from . import instrumentation
+
+io = lazy.LazyModule("avalon.io")
+api = lazy.LazyModule("avalon.api")
+
+log = logging.getLogger(__name__)
+
+# Seconds of the previous sync to fetch again, see `Catalog.sync`
+OVERLAP = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subsets (
+    id TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subsets_parent ON subsets (parent);
+CREATE INDEX IF NOT EXISTS versions_parent ON versions (parent, name);
+"""
+
+
+def get_catalog_path(project=None):
+    """Return the default catalog file path for the project
+
+    Args:
+        project (str, optional): project name, defaults to the
+            current AVALON_PROJECT
+
+    Returns:
+        str
+
+    """
+    project = project or api.Session["AVALON_PROJECT"]
+    root = os.path.join(os.path.expanduser("~"), ".mayalookassigner")
+    return os.path.join(root, "{}.db".format(project))
+
+
+class Catalog(object):
+    """SQLite backed snapshot of the project's assets and looks
+
+    Documents are returned in the same form as the database returns them
+    so they can be used in place of the `avalon.io` queries.
+
+    Args:
+        path (str): file path of the catalog, created when missing
+
+    """
+
+    def __init__(self, path):
+        root = os.path.dirname(path)
+        if root and not os.path.exists(root):
+            os.makedirs(root)
+
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def export(self, destination):
+        """Copy the catalog file to `destination`"""
+        self._connection.commit()
+        shutil.copyfile(self.path, destination)
+
+    def _get_meta(self, key):
+        row = self._connection.execute("SELECT value FROM meta WHERE key=?",
+                                       (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                 (key, value))
+
+    @property
+    def last_sync(self):
+        """Time of the last sync in seconds since the epoch, or None"""
+        value = self._get_meta("last_sync")
+        return float(value) if value is not None else None
+
+    def sync(self, full=False):
+        """Fetch the documents created since the last sync
+
+        Both queries are bounded by the same cutoff so a look and its
+        version published during the sync are fetched together in the
+        next sync. The window of the previous sync is re-fetched by
+        `OVERLAP` seconds to catch documents of publishers with a
+        lagging clock, since ObjectIds are generated on the client.
+        Only the versions of look subsets are queried.
+
+        Args:
+            full (bool): re-fetch all documents instead
+
+        Returns:
+            int: the amount of documents fetched
+
+        """
+
+        last_id = None if full else self._get_meta("last_id")
+        cutoff = io.ObjectId.from_datetime(datetime.datetime.utcnow())
+        query = {"_id": {"$lt": cutoff}}
+        if last_id:
+            start = io.ObjectId(last_id).generation_time
+            start -= datetime.timedelta(seconds=OVERLAP)
+            query["_id"]["$gte"] = io.ObjectId.from_datetime(start)
+
+        cursor = self._connection.cursor()
+        if full:
+            cursor.execute("DELETE FROM assets")
+            cursor.execute("DELETE FROM subsets")
+            cursor.execute("DELETE FROM versions")
+
+        with instrumentation.operation("sync catalog"):
+            documents = instrumentation.find(
+                dict(query, **{"$or": [{"type": "asset"},
+                                       {"type": "subset",
+                                        "name": {"$regex": "^look"}}]}),
+                projection={"type": True, "name": True, "parent": True}
+            )
+
+            assets = [(str(doc["_id"]), doc["name"])
+                      for doc in documents if doc["type"] == "asset"]
+            subsets = [(str(doc["_id"]), str(doc["parent"]), doc["name"])
+                       for doc in documents if doc["type"] == "subset"]
+            cursor.executemany("INSERT OR REPLACE INTO assets "
+                               "VALUES (?, ?)", assets)
+            cursor.executemany("INSERT OR REPLACE INTO subsets "
+                               "VALUES (?, ?, ?)", subsets)
+
+            # Only fetch the versions of the look subsets, both the stored
+            # and the ones just fetched
+            look_subsets = [io.ObjectId(row[0]) for row in
+                            cursor.execute("SELECT id FROM subsets")]
+            versions = []
+            if look_subsets:
+                versions = instrumentation.find(
+                    dict(query, type="version",
+                         parent={"$in": look_subsets}),
+                    projection={"name": True, "parent": True}
+                )
+
+        versions = [(str(doc["_id"]), str(doc["parent"]), doc["name"])
+                    for doc in versions]
+        cursor.executemany("INSERT OR REPLACE INTO versions VALUES (?, ?, ?)",
+                           versions)
+
+        fetched = documents + versions
+        self._set_meta("last_id", str(cutoff))
+        self._set_meta("last_sync", str(time.time()))
+        self._connection.commit()
+
+        log.info("Synced %i assets, %i looks and %i versions to %s",
+                 len(assets), len(subsets), len(versions), self.path)
+
+        return len(fetched)
+
+    def find_assets(self, asset_ids):
+        """Return the asset documents of the asset ids that exist"""
+        asset_ids = [str(_id) for _id in asset_ids]
+        assets = []
+
+        # Stay below the maximum number of SQLite host parameters
+        for i in range(0, len(asset_ids), 500):
+            chunk = asset_ids[i:i + 500]
+            rows = self._connection.execute(
+                "SELECT id, name FROM assets WHERE id IN (%s)" %
+                ", ".join("?" * len(chunk)), chunk)
+            assets.extend({"_id": io.ObjectId(_id), "name": name}
+                          for _id, name in rows)
+
+        return assets
+
+    def list_looks(self, asset_id):
+        """Return the look subset documents of the asset"""
+        rows = self._connection.execute("SELECT id, parent, name "
+                                        "FROM subsets WHERE parent=?",
+                                        (str(asset_id),))
+        return [{"_id": io.ObjectId(_id),
+                 "type": "subset",
+                 "parent": io.ObjectId(parent),
+                 "name": name} for _id, parent, name in rows]
+
+    def find_latest_version(self, subset_id):
+        """Return the latest version document of the subset, or None"""
+        row = self._connection.execute("SELECT id, parent, name "
+                                       "FROM versions WHERE parent=? "
+                                       "ORDER BY name DESC LIMIT 1",
+                                       (str(subset_id),)).fetchone()
+        if row is None:
+            return None
+        return {"_id": io.ObjectId(row[0]),
+                "type": "version",
+                "parent": io.ObjectId(row[1]),
+                "name": row[2]}
@@ -1,14 +1,22 @@
 from collections import defaultdict
+import contextlib
 import logging
 import os
+import re
 
 import maya.cmds as cmds
 
-import colorbleed.maya.lib as cblib
-from avalon import io, api
+from . import lazy
+from . import instrumentation
+
+cblib = lazy.LazyModule("colorbleed.maya.lib")
+io = lazy.LazyModule("avalon.io")
+api = lazy.LazyModule("avalon.api")
 
 log = logging.getLogger(__name__)
 
+OBJECTID = re.compile(r"^[0-9a-f]{24}$", re.IGNORECASE)
+
 
 def get_workfile():
     path = cmds.file(query=True, sceneName=True) or "untitled"
@@ -23,6 +31,42 @@ def select(nodes):
     cmds.select(nodes)
 
 
+@contextlib.contextmanager
+def undo_chunk(name):
+    """Group all operations within the context into a single undo chunk"""
+
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    try:
+        yield
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+@contextlib.contextmanager
+def suspended_refresh():
+    """Suspend viewport refreshes within the context"""
+
+    cmds.refresh(suspend=True)
+    try:
+        yield
+    finally:
+        cmds.refresh(suspend=False)
+
+
+@contextlib.contextmanager
+def assignment_transaction(name):
+    """Run all assignments within the context as a single transaction
+
+    The viewport refresh is suspended and all operations are grouped into
+    one named undo chunk. Both are restored when an error occurs.
+
+    """
+
+    with undo_chunk(name):
+        with suspended_refresh():
+            yield
+
+
 def get_namespace_from_node(node):
     """Get the namespace from the given node
 
@@ -93,6 +137,25 @@ def get_all_asset_nodes():
     return nodes
 
 
+def get_asset_id(node):
+    """Return the asset id of the node's cbId
+
+    The asset id is lowercased to match the string of the asset's ObjectId
+    as the id may have been written in uppercase.
+
+    Args:
+        node (str): name of the node
+
+    Returns:
+        str: the asset id or None when the node has no cbId
+    """
+    value = cblib.get_id(node)
+    if value is None:
+        return None
+
+    return value.split(":")[0].lower()
+
+
 def create_asset_id_hash(nodes):
     """Create a hash based on cbId attribute value
     Args:
@@ -103,17 +166,131 @@ def create_asset_id_hash(nodes):
     """
     node_id_hash = defaultdict(list)
     for node in nodes:
-        value = cblib.get_id(node)
-        if value is None:
+        asset_id = get_asset_id(node)
+        if asset_id is None:
             continue
 
-        asset_id = value.split(":")[0]
         node_id_hash[asset_id].append(node)
 
     return dict(node_id_hash)
 
 
-def create_items_from_nodes(nodes):
+def create_asset_namespace_hash(nodes):
+    """Create a hash of the nodes per asset id and namespace
+
+    This allows to look up the nodes of an asset in a namespace directly
+    instead of filtering all nodes of the asset by namespace.
+
+    Args:
+        nodes (list): a list of nodes
+
+    Returns:
+        dict: asset id to a dict of namespace to list of nodes
+    """
+    node_hash = defaultdict(lambda: defaultdict(list))
+    for node in nodes:
+        asset_id = get_asset_id(node)
+        if asset_id is None:
+            continue
+
+        namespace = get_namespace_from_node(node)
+        node_hash[asset_id][namespace].append(node)
+
+    return dict((asset_id, dict(namespaces))
+                for asset_id, namespaces in node_hash.items())
+
+
+def list_namespace_nodes(namespaces):
+    """List the dag nodes which are directly in the given namespaces
+
+    Listing a namespace with `dag=True` also returns the dag descendants of
+    its nodes, so nodes parented under them from other namespaces are
+    filtered out.
+
+    Args:
+        namespaces (list): namespaces, ":" being the root namespace
+
+    Returns:
+        list: long names of the nodes
+    """
+    namespaces = set(namespaces)
+    if ":" in namespaces:
+        nodes = cmds.ls(dag=True, long=True)
+    else:
+        patterns = ["{}:*".format(namespace) for namespace in namespaces]
+        nodes = cmds.ls(patterns, dag=True, long=True) if patterns else []
+
+    return [node for node in nodes
+            if get_namespace_from_node(node) in namespaces]
+
+
+def get_asset_nodes(id_hash, asset_id, namespaces=None):
+    """Return the nodes of an asset in the given namespaces
+
+    Only the nodes of the asset itself are filtered by namespace, which is
+    cheaper than hashing all nodes by namespace up front.
+
+    Args:
+        id_hash (dict): nodes per asset id, see `create_asset_id_hash`
+        asset_id (str): id of the asset
+        namespaces (set, optional): only return the nodes in these
+            namespaces, all nodes of the asset are returned when None
+
+    Returns:
+        list: the nodes of the asset
+    """
+    nodes = id_hash.get(asset_id, [])
+    if namespaces is None:
+        return nodes
+
+    return [node for node in nodes
+            if get_namespace_from_node(node) in namespaces]
+
+
+def get_latest_version(subset_id, catalog=None):
+    """Get the latest version document of a subset
+
+    Args:
+        subset_id (io.ObjectId): id of the subset
+        catalog (Catalog, optional): read from this local catalog instead
+            of the database
+
+    Returns:
+        dict: the version document or None
+
+    """
+    if catalog is not None:
+        return catalog.find_latest_version(subset_id)
+
+    return instrumentation.find_one({"type": "version",
+                                     "parent": subset_id},
+                                    sort=[("name", -1)])
+
+
+def assign_latest_version(subset_id, nodes, catalog=None):
+    """Assign the latest version of a look subset to the nodes
+
+    Args:
+        subset_id (io.ObjectId): id of the look subset
+        nodes (list): the nodes to assign the look to
+        catalog (Catalog, optional): read the version from this local
+            catalog instead of the database
+
+    Returns:
+        dict: the assigned version document or None when the subset has
+            no versions
+
+    """
+    version = get_latest_version(subset_id, catalog=catalog)
+    if not version:
+        return None
+
+    cblib.assign_look_by_version(nodes=nodes, version_id=version["_id"])
+
+    return version
+
+
+def create_items_from_nodes(nodes, catalog=None):
     """Create an item for the view based the container and content of it
 
     It fetches the look document based on the asset ID found in the content.
@@ -124,38 +301,143 @@ def create_items_from_nodes(nodes):
 
     Args:
         nodes (list): list of maya nodes
+        catalog (Catalog, optional): read the assets and looks from this
+            local catalog instead of the database
 
     Returns:
         list of dicts
 
     """
 
-    asset_view_items = []
-
     id_hashes = create_asset_id_hash(nodes)
-    if not id_hashes:
-        return asset_view_items
+    return create_items_from_id_hash(id_hashes, catalog=catalog)
 
-    for _id, id_nodes in id_hashes.items():
 
-        try:
-            database_id = io.ObjectId(_id)
-        except io.InvalidId:
-            log.warning("Invalid ObjectId '%s' on nodes: %s" %
-                        (_id, id_nodes))
+def find_assets(asset_ids, catalog=None):
+    """Find the asset documents of the asset ids in a single query
+
+    Args:
+        asset_ids (list): asset ids, must be valid ObjectIds
+        catalog (Catalog, optional): read the assets from this local
+            catalog instead of the database
+
+    Returns:
+        dict: asset id, as given, to asset document for the assets that exist
+
+    """
+    if not asset_ids:
+        return {}
+
+    database_ids = [io.ObjectId(_id) for _id in asset_ids]
+    if catalog is not None:
+        assets = catalog.find_assets(database_ids)
+    else:
+        assets = instrumentation.find({"_id": {"$in": database_ids}},
+                                      projection={"name": True})
+
+    # Ids are matched case insensitive like ObjectId does
+    found = dict((str(asset["_id"]).lower(), asset) for asset in assets)
+    return dict((_id, found[_id.lower()]) for _id in asset_ids
+                if _id.lower() in found)
+
+
+def scan_id_integrity(nodes, catalog=None):
+    """Validate the cbIds of all nodes in bulk
+
+    The asset ids are format checked in one pass and looked up in a single
+    query. Nodes sharing the same full id within the same namespace are
+    reported as duplicates, instances of the same node are not. The
+    duplicates of all namespaces are reported together per full id.
+
+    Args:
+        nodes (list): list of maya nodes
+        catalog (Catalog, optional): read the assets from this local
+            catalog instead of the database
+
+    Returns:
+        dict: the nodes per id for each problem type ("invalid",
+            "missing" and "duplicate") together with the "id_hashes" of
+            the nodes and the found "assets"
+
+    """
+
+    id_hashes = defaultdict(list)
+    full_ids = defaultdict(list)
+    for node in nodes:
+        value = cblib.get_id(node)
+        if value is None:
             continue
 
-        asset = io.find_one({"_id": database_id},
-                            projection={"name": True})
+        asset_id, separator, suffix = value.partition(":")
+        asset_id = asset_id.lower()
+        id_hashes[asset_id].append(node)
+        full_ids[(get_namespace_from_node(node),
+                  asset_id + separator + suffix)].append(node)
 
-        # Skip if asset id is not found
+    invalid = dict()
+    for asset_id in [_id for _id in id_hashes if not OBJECTID.match(_id)]:
+        invalid[asset_id] = id_hashes.pop(asset_id)
+
+    assets = find_assets(list(id_hashes), catalog=catalog)
+    missing = dict((asset_id, id_hashes.pop(asset_id))
+                   for asset_id in list(id_hashes) if asset_id not in assets)
+
+    duplicate = dict()
+    for (namespace, value), id_nodes in full_ids.items():
+        if len(id_nodes) < 2:
+            continue
+
+        # Instanced paths share the same node and thus the same uuid
+        if len(set(cmds.ls(id_nodes, uuid=True))) > 1:
+            duplicate.setdefault(value, []).extend(id_nodes)
+
+    return {"id_hashes": dict(id_hashes),
+            "assets": assets,
+            "invalid": invalid,
+            "missing": missing,
+            "duplicate": duplicate}
+
+
+def create_items_from_id_hash(id_hashes, catalog=None, assets=None):
+    """Create the view items for the nodes per asset id
+
+    Asset ids which are invalid or not registered in the project are
+    skipped with a single warning, see `scan_id_integrity` for details.
+
+    Args:
+        id_hashes (dict): asset id to nodes, see `create_asset_id_hash`
+        catalog (Catalog, optional): read the assets and looks from this
+            local catalog instead of the database
+        assets (dict, optional): asset id to the already found asset
+            documents, see `find_assets`
+
+    Returns:
+        list of dicts
+
+    """
+
+    if assets is None:
+        valid = [_id for _id in id_hashes if OBJECTID.match(_id)]
+        assets = find_assets(valid, catalog=catalog)
+
+    skipped = [_id for _id in id_hashes if _id not in assets]
+    if skipped:
+        log.warning("Skipped %i invalid or unknown asset ids on %i nodes, "
+                    "see the id problems for details.", len(skipped),
+                    sum(len(id_hashes[_id]) for _id in skipped))
+
+    asset_view_items = []
+    for _id, id_nodes in id_hashes.items():
+
+        asset = assets.get(_id)
         if not asset:
-            log.warning("Id not found in the database, skipping '%s'." % _id)
-            log.warning("Nodes: %s" % id_nodes)
             continue
 
         # Collect available look subsets for this asset
-        looks = cblib.list_looks(asset["_id"])
+        if catalog is not None:
+            looks = catalog.list_looks(asset["_id"])
+        else:
+            looks = instrumentation.list_looks(asset["_id"])
 
         # Collect namespaces the asset is found in
         namespaces = set()
@@ -171,6 +453,31 @@ def create_items_from_nodes(nodes):
     return asset_view_items
 
 
+def create_items_per_namespace(nodes, catalog=None):
+    """Create the view items of the nodes with their nodes per namespace
+
+    Args:
+        nodes (list): list of maya nodes
+        catalog (Catalog, optional): read the assets and looks from this
+            local catalog instead of the database
+
+    Returns:
+        list: the view items with the nodes per namespace of the asset
+            under "namespaces", see `rules.RuleSet.plan`
+
+    """
+
+    node_hash = create_asset_namespace_hash(nodes)
+    id_hashes = dict((asset_id, [node for namespace_nodes
+                                 in namespaces.values()
+                                 for node in namespace_nodes])
+                     for asset_id, namespaces in node_hash.items())
+    items = create_items_from_id_hash(id_hashes, catalog=catalog)
+
+    return [dict(item, namespaces=node_hash[str(item["asset"]["_id"])])
+            for item in items]
+
+
 def remove_unused_looks():
     """Removes all loaded looks for which none of the shaders are used.
 
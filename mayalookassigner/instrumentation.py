@@ -0,0 +1,201 @@
+"""Accounting of the database round-trips made by the Look Manager.
+
+All database access of the tool goes through the query functions in this
+module so every call is recorded with its latency and query shape. Wrap a
+user action in `operation()` to get a summary of the queries it triggered
+or in `query_budget()` to assert it stays within a number of round-trips.
+
+Example:
+    Listing assets takes one query for all assets and one `list_looks`
+    per asset found:
+
+    >>> with query_budget(1 + len(asset_ids), name="refresh all assets"):
+    ...     commands.create_items_from_nodes(nodes)
+
+"""
+import time
+import logging
+import contextlib
+from collections import defaultdict
+
+from . import lazy
+
+cblib = lazy.LazyModule("colorbleed.maya.lib")
+io = lazy.LazyModule("avalon.io")
+
+log = logging.getLogger(__name__)
+
+# Operations currently being recorded, innermost last
+_active = []
+
+
+class QueryStats(object):
+    """Collection of the database queries made during an operation"""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def count(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return sum(record["duration"] for record in self.records)
+
+    def record(self, query, shape, duration):
+        self.records.append({"query": query,
+                             "shape": shape,
+                             "duration": duration})
+
+    def by_shape(self):
+        """Group the recorded queries by query and shape
+
+        Returns:
+            dict: (query, shape) to a dict with "count" and "duration"
+
+        """
+        summary = defaultdict(lambda: {"count": 0, "duration": 0.0})
+        for record in self.records:
+            entry = summary[(record["query"], record["shape"])]
+            entry["count"] += 1
+            entry["duration"] += record["duration"]
+
+        return dict(summary)
+
+    def format(self):
+        """Return a readable multi-line summary of the recorded queries"""
+
+        lines = ["{0}: {1} queries in {2:.3f}s".format(self.name or "queries",
+                                                       self.count,
+                                                       self.duration)]
+        summary = self.by_shape()
+        for key in sorted(summary, key=lambda k: -summary[k]["count"]):
+            query, shape = key
+            entry = summary[key]
+            lines.append("  {0}x {1}({2}) {3:.3f}s".format(entry["count"],
+                                                           query,
+                                                           shape,
+                                                           entry["duration"]))
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when an operation makes more queries than its budget"""
+
+
+def get_shape(value):
+    """Return the shape of a query with all literal values stripped
+
+    Two queries that only differ in the ids or names they look for get the
+    same shape, e.g. {"_id": ObjectId(..)} becomes {"_id": ?}.
+
+    Args:
+        value: query filter, projection or sort argument
+
+    Returns:
+        str
+
+    """
+    if isinstance(value, dict):
+        return "{%s}" % ", ".join("%s: %s" % (key, get_shape(value[key]))
+                                  for key in sorted(value))
+    if isinstance(value, (list, tuple)):
+        # Keep operator lists like $or readable but collapse literal lists
+        if value and all(isinstance(v, dict) for v in value):
+            return "[%s]" % ", ".join(get_shape(v) for v in value)
+        return "[?]"
+    return "?"
+
+
+def _record(query, shape, duration):
+    log.debug("%s(%s) %.4fs", query, shape, duration)
+    for stats in _active:
+        stats.record(query, shape, duration)
+
+
+def _timed(query, shape, func, *args, **kwargs):
+    start = time.time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _record(query, shape, time.time() - start)
+
+
+def find_one(filter, *args, **kwargs):
+    """Recorded `avalon.io.find_one`"""
+    return _timed("find_one", get_shape(filter),
+                  io.find_one, filter, *args, **kwargs)
+
+
+def find(filter, *args, **kwargs):
+    """Recorded `avalon.io.find`
+
+    The cursor is fully consumed so the recorded latency includes the
+    actual transfer of the documents.
+
+    Returns:
+        list: the found documents
+
+    """
+    return _timed("find", get_shape(filter),
+                  lambda: list(io.find(filter, *args, **kwargs)))
+
+
+def list_looks(asset_id):
+    """Recorded `colorbleed.maya.lib.list_looks`"""
+    return _timed("list_looks", get_shape({"parent": asset_id}),
+                  cblib.list_looks, asset_id)
+
+
+def log_timing(name, duration):
+    """Report the duration of a step which is not a database query"""
+    log.info("%s: %.3fs", name, duration)
+
+
+@contextlib.contextmanager
+def operation(name):
+    """Record all queries made within the context
+
+    The summary is logged on exit, at debug level when no queries were
+    made so frequent operations do not flood the Script Editor.
+
+    Args:
+        name (str): label of the user action, e.g. "assign looks"
+
+    Yields:
+        QueryStats: the queries recorded so far
+
+    """
+    stats = QueryStats(name)
+    _active.append(stats)
+    try:
+        yield stats
+    finally:
+        _active.remove(stats)
+        level = logging.INFO if stats.count else logging.DEBUG
+        log.log(level, stats.format())
+
+
+@contextlib.contextmanager
+def query_budget(budget, name=None):
+    """Assert the queries made within the context stay within `budget`
+
+    Args:
+        budget (int): maximum amount of database round-trips
+        name (str, optional): label of the operation for the report
+
+    Raises:
+        QueryBudgetExceeded: when more than `budget` queries were made
+
+    """
+    with operation(name or "query budget") as stats:
+        yield stats
+
+    if stats.count > budget:
+        raise QueryBudgetExceeded("Exceeded query budget of {0}, "
+                                  "{1}".format(budget, stats.format()))
@@ -0,0 +1,122 @@
+import time
+import logging
+
+from avalon.vendor.Qt import QtCore
+
+from . import commands
+
+log = logging.getLogger(__name__)
+
+
+class ChunkedJob(QtCore.QObject):
+    """Process items in chunks while yielding to the Qt event loop
+
+    Each chunk is processed in its own undo chunk and control is handed
+    back to the event loop in between chunks so the interface stays
+    responsive. A cancelled job stops at the next chunk boundary.
+
+    Args:
+        name (str): label of the job, used for the undo chunks
+        items (list): the items to process
+        process (callable): called with each item, returns a message
+        chunk_size (int): amount of items to process per chunk
+        contexts (list): context managers entered on start and exited
+            when the job stops
+
+    """
+
+    progressed = QtCore.Signal(int, int, str)  # done, total, message
+    finished = QtCore.Signal(bool)             # whether it completed
+
+    def __init__(self, name, items, process, chunk_size=1, contexts=None,
+                 parent=None):
+        super(ChunkedJob, self).__init__(parent)
+
+        self.name = name
+        self.items = list(items)
+        self.process = process
+        self.chunk_size = max(1, chunk_size)
+        self.contexts = list(contexts or [])
+
+        self.timings = []
+        self._index = 0
+        self._cancelled = False
+        self._running = False
+        self._entered = []
+        self._start = None
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def duration(self):
+        return time.time() - self._start if self._start else 0.0
+
+    def start(self):
+        self._running = True
+        self._start = time.time()
+        try:
+            for context in self.contexts:
+                context.__enter__()
+                self._entered.append(context)
+        except Exception:
+            log.exception("Failed to start %s", self.name)
+            self._stop(completed=False)
+            return
+
+        QtCore.QTimer.singleShot(0, self._process_next_chunk)
+
+    def cancel(self):
+        """Stop the job at the next chunk boundary"""
+        self._cancelled = True
+
+    def stop(self):
+        """Stop the job immediately, e.g. when its owner gets closed"""
+        if self._running:
+            self._cancelled = True
+            self._stop(completed=False)
+
+    def _process_next_chunk(self):
+
+        if not self._running:
+            return
+
+        if self._cancelled or self._index >= len(self.items):
+            self._stop(completed=not self._cancelled)
+            return
+
+        chunk = self.items[self._index:self._index + self.chunk_size]
+        chunk_name = "{} ({}/{})".format(self.name,
+                                         self._index + 1,
+                                         len(self.items))
+        try:
+            with commands.undo_chunk(chunk_name):
+                for item in chunk:
+                    start = time.time()
+                    message = self.process(item)
+                    duration = time.time() - start
+                    self.timings.append((message, duration))
+                    self._index += 1
+
+                    log.debug("%s: %.3fs", message, duration)
+                    self.progressed.emit(self._index,
+                                         len(self.items),
+                                         message or "")
+        except Exception:
+            log.exception("Failed processing %s", chunk_name)
+            self._stop(completed=False)
+            return
+
+        QtCore.QTimer.singleShot(0, self._process_next_chunk)
+
+    def _stop(self, completed):
+        while self._entered:
+            context = self._entered.pop()
+            try:
+                context.__exit__(None, None, None)
+            except Exception:
+                log.exception("Failed to exit %s", context)
+
+        self._running = False
+        self.finished.emit(completed)
@@ -0,0 +1,33 @@
+import time
+import logging
+import importlib
+
+log = logging.getLogger(__name__)
+
+
+class LazyModule(object):
+    """Proxy which imports the module on first attribute access
+
+    This keeps heavy modules out of the import of the tool's package,
+    e.g. `io = LazyModule("avalon.io")`. Modules the window needs itself,
+    like the Maya API for its callbacks or anything `avalon.tools` imports,
+    still load when the window is created.
+
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attr):
+        module = self.__dict__["_module"]
+        if module is None:
+            start = time.time()
+            module = importlib.import_module(self.__dict__["_name"])
+            log.debug("Imported %s in %.3fs", self.__dict__["_name"],
+                      time.time() - start)
+            self.__dict__["_module"] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return "<LazyModule '%s'>" % self.__dict__["_name"]
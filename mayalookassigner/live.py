@@ -0,0 +1,123 @@
+import logging
+from collections import defaultdict
+
+from maya import cmds
+
+from . import commands
+
+log = logging.getLogger(__name__)
+
+
+class SelectionTracker(object):
+    """Keep track of the assets in the selection by applying deltas
+
+    Only the descendents of newly selected nodes are listed, in one batch
+    for all of them, and only asset
+    ids that were not seen before are looked up in the database. The
+    resolved assets are cached for the lifetime of the tracker.
+
+    Args:
+        catalog (Catalog, optional): read the assets and looks from this
+            local catalog instead of the database
+
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog
+
+        self._roots = dict()                   # selected node: its nodes
+        self._node_refs = defaultdict(int)     # node: selected roots count
+        self._node_ids = dict()                # node: asset id
+        self._asset_nodes = defaultdict(set)   # asset id: nodes
+        self._assets = dict()                  # asset id: item or None
+
+    def update(self, selection=None):
+        """Apply the difference with the previous selection
+
+        Args:
+            selection (list, optional): long names of the selected nodes,
+                defaults to the current selection
+
+        Returns:
+            tuple: list of changed items and list of removed asset ids
+
+        """
+
+        if selection is None:
+            selection = cmds.ls(selection=True, long=True)
+        selection = set(selection)
+
+        added_roots = selection.difference(self._roots)
+        removed_roots = set(self._roots).difference(selection)
+        if not added_roots and not removed_roots:
+            return [], []
+
+        touched = set()
+
+        for root in removed_roots:
+            for node in self._roots.pop(root):
+                self._node_refs[node] -= 1
+                if self._node_refs[node]:
+                    continue
+
+                del self._node_refs[node]
+                asset_id = self._node_ids.pop(node, None)
+                if asset_id is not None:
+                    self._asset_nodes[asset_id].discard(node)
+                    touched.add(asset_id)
+
+        # List the descendents of all added roots at once and map them back
+        # to each of the roots they are under
+        added = dict((root, set([root])) for root in added_roots)
+        if added:
+            for node in set(commands.list_descendents(list(added))):
+                parts = node.split("|")
+                for i in range(2, len(parts)):
+                    root = "|".join(parts[:i])
+                    if root in added:
+                        added[root].add(node)
+
+        for root, nodes in added.items():
+            self._roots[root] = nodes
+            for node in nodes:
+                self._node_refs[node] += 1
+                if self._node_refs[node] > 1:
+                    continue
+
+                asset_id = commands.get_asset_id(node)
+                if asset_id is None:
+                    continue
+
+                self._node_ids[node] = asset_id
+                self._asset_nodes[asset_id].add(node)
+                touched.add(asset_id)
+
+        # Resolve only the asset ids we have not seen before
+        unseen = dict((asset_id, list(self._asset_nodes[asset_id]))
+                      for asset_id in touched if asset_id not in self._assets)
+        if unseen:
+            for asset_id in unseen:
+                self._assets[asset_id] = None
+            items = commands.create_items_from_id_hash(unseen,
+                                                       catalog=self.catalog)
+            for item in items:
+                self._assets[str(item["asset"]["_id"])] = item
+
+        changed = []
+        removed = []
+        for asset_id in touched:
+            item = self._assets[asset_id]
+            if item is None:
+                continue
+
+            nodes = self._asset_nodes[asset_id]
+            if not nodes:
+                del self._asset_nodes[asset_id]
+                removed.append(asset_id)
+                continue
+
+            namespaces = set(commands.get_namespace_from_node(node)
+                             for node in nodes)
+            changed.append(dict(item, namespaces=namespaces))
+
+        return changed, removed
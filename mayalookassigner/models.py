@@ -2,9 +2,12 @@ from collections import defaultdict
 from avalon.tools import models
 
 from avalon.vendor.Qt import QtCore
-from avalon.vendor import qtawesome
 from avalon.style import colors
 
+from . import lazy
+
+qtawesome = lazy.LazyModule("avalon.vendor.qtawesome")
+
 
 class AssetModel(models.TreeModel):
 
@@ -26,29 +29,73 @@ class AssetModel(models.TreeModel):
         sorter = lambda x: x["label"]
 
         for item in sorted(items, key=sorter):
-
-            asset_item = models.Item()
-            asset_item.update(item)
-            asset_item["icon"] = "folder"
-
-            # Add namespace children
-            namespaces = item["namespaces"]
-            for namespace in sorted(namespaces):
-                child = models.Item()
-                child.update(item)
-                child.update({
-                    "label": (namespace if namespace != ":"
-                              else "(no namespace)"),
-                    "namespace": namespace,
-                    "looks": item["looks"],
-                    "icon": "folder-o"
-                })
-                asset_item.add_child(child)
-
-            self.add_child(asset_item)
+            self.add_child(self._create_asset_item(item))
 
         self.endResetModel()
 
+    def set_item(self, item):
+        """Add or replace the row of a single asset
+
+        Args:
+            item(dict): item data of the asset
+
+        Returns:
+            None
+        """
+
+        asset_id = str(item["asset"]["_id"])
+        self.remove_item(asset_id)
+
+        root = self._root_item
+        rows = root.children()
+        row = next((i for i, existing in enumerate(rows)
+                    if existing["label"] > item["label"]), len(rows))
+
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        root.add_child(self._create_asset_item(item))
+        rows.insert(row, rows.pop())
+        self.endInsertRows()
+
+    def remove_item(self, asset_id):
+        """Remove the row of the asset, if present
+
+        Args:
+            asset_id(str): id of the asset
+
+        Returns:
+            None
+        """
+
+        rows = self._root_item.children()
+        for row, existing in enumerate(rows):
+            if str(existing["asset"]["_id"]) == asset_id:
+                self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+                rows.pop(row)
+                self.endRemoveRows()
+                return
+
+    def _create_asset_item(self, item):
+
+        asset_item = models.Item()
+        asset_item.update(item)
+        asset_item["icon"] = "folder"
+
+        # Add namespace children
+        namespaces = item["namespaces"]
+        for namespace in sorted(namespaces):
+            child = models.Item()
+            child.update(item)
+            child.update({
+                "label": (namespace if namespace != ":"
+                          else "(no namespace)"),
+                "namespace": namespace,
+                "looks": item["looks"],
+                "icon": "folder-o"
+            })
+            asset_item.add_child(child)
+
+        return asset_item
+
     def data(self, index, role):
 
         if not index.isValid():
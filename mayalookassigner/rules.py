@@ -0,0 +1,168 @@
+"""Rule based bulk assignment of looks
+
+A rule maps an asset name or namespace pattern to a look subset, e.g.
+`tree_*` -> `lookAutumn`. The rules of a `RuleSet` are compiled once and
+evaluated in order of priority against all assets and namespaces of the
+scene in a single pass, producing one deduplicated assignment plan.
+
+This module does not depend on Maya so rule sets can be evaluated
+headless against a stand-in scene description.
+
+"""
+import os
+import re
+import json
+import fnmatch
+import logging
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+FIELDS = ("asset", "namespace")
+SYNTAXES = ("glob", "regex")
+
+
+def get_rules_path(project):
+    """Return the rule set file path for the project"""
+    root = os.path.join(os.path.expanduser("~"), ".mayalookassigner")
+    return os.path.join(root, "{}_rules.json".format(project))
+
+
+class Rule(object):
+    """Assign `look` to assets whose name or namespace matches `pattern`
+
+    Args:
+        pattern (str): glob or regular expression to match
+        look (str): name of the look subset to assign
+        field (str): match against "asset" name or "namespace"
+        syntax (str): "glob" or "regex"
+        priority (int): rules with a higher priority are evaluated first
+
+    """
+
+    def __init__(self, pattern, look, field="asset", syntax="glob",
+                 priority=0):
+
+        if field not in FIELDS:
+            raise ValueError("Invalid rule field '%s', "
+                             "expected one of: %s" % (field, FIELDS))
+        if syntax not in SYNTAXES:
+            raise ValueError("Invalid rule syntax '%s', "
+                             "expected one of: %s" % (syntax, SYNTAXES))
+
+        self.pattern = pattern
+        self.look = look
+        self.field = field
+        self.syntax = syntax
+        self.priority = priority
+
+        # Both syntaxes must match the full name, not only its start
+        if syntax == "glob":
+            self._regex = re.compile(fnmatch.translate(pattern))
+        else:
+            self._regex = re.compile(r"(?:%s)\Z" % pattern)
+
+    def __repr__(self):
+        return "Rule(%s %s %r -> %s)" % (self.field, self.syntax,
+                                         self.pattern, self.look)
+
+    def match(self, asset_name, namespace):
+        value = asset_name if self.field == "asset" else namespace
+        return self._regex.match(value) is not None
+
+    def to_data(self):
+        return {"pattern": self.pattern,
+                "look": self.look,
+                "field": self.field,
+                "syntax": self.syntax,
+                "priority": self.priority}
+
+
+class RuleSet(object):
+    """Ordered collection of rules
+
+    Rules are evaluated by descending priority, rules with the same
+    priority keep the order they were given in.
+
+    Args:
+        rules (list): list of Rule
+
+    """
+
+    def __init__(self, rules=None):
+        rules = list(rules or [])
+        self.rules = sorted(rules, key=lambda rule: -rule.priority)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(Rule(**rule) for rule in data.get("rules", []))
+
+    def to_data(self):
+        return {"rules": [rule.to_data() for rule in self.rules]}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_data(json.load(f))
+
+    def save(self, path):
+        root = os.path.dirname(path)
+        if root and not os.path.exists(root):
+            os.makedirs(root)
+
+        with open(path, "w") as f:
+            json.dump(self.to_data(), f, indent=4, sort_keys=True)
+
+    def match(self, asset_name, namespace, looks):
+        """Return the look subset of the first matching rule, or None
+
+        Args:
+            asset_name (str): name of the asset
+            namespace (str): namespace the asset is in
+            looks (dict): look subset name to subset document of the asset
+
+        """
+        for rule in self.rules:
+            if rule.look in looks and rule.match(asset_name, namespace):
+                return looks[rule.look]
+
+    def plan(self, assets):
+        """Create the assignment plan for the assets
+
+        Each asset is described by a dictionary with the asset document
+        under "asset", its look subset documents under "looks" and its
+        nodes per namespace under "namespaces".
+
+        The namespaces of an asset that get the same look are merged into
+        a single entry so each look is assigned only once per asset.
+
+        Args:
+            assets (list): the assets to plan the assignments for
+
+        Returns:
+            list: dictionaries with "asset", "look", "namespaces" and "nodes"
+
+        """
+
+        plan = OrderedDict()
+        for asset in assets:
+            name = asset["asset"]["name"]
+            looks = dict((look["name"], look) for look in asset["looks"])
+
+            for namespace in sorted(asset["namespaces"]):
+                look = self.match(name, namespace, looks)
+                if look is None:
+                    log.debug("No rule matches %s in %s", name, namespace)
+                    continue
+
+                key = (str(asset["asset"]["_id"]), str(look["_id"]))
+                entry = plan.get(key)
+                if entry is None:
+                    entry = plan[key] = {"asset": asset["asset"],
+                                         "look": look,
+                                         "namespaces": [],
+                                         "nodes": []}
+                entry["namespaces"].append(namespace)
+                entry["nodes"].extend(asset["namespaces"][namespace])
+
+        return list(plan.values())
@@ -0,0 +1,204 @@
+"""Snapshot of the look assignments in the scene for fast replay
+
+A snapshot stores per namespace which look versions are assigned and the
+members of each of their shading engines by cbId. Replaying it re-applies
+those relationships directly to the loaded looks, without querying the
+database or reading the published look data again.
+
+"""
+import json
+import logging
+from collections import defaultdict
+
+from maya import cmds
+
+from . import lazy
+from . import commands
+from . import instrumentation
+
+cblib = lazy.LazyModule("colorbleed.maya.lib")
+io = lazy.LazyModule("avalon.io")
+api = lazy.LazyModule("avalon.api")
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def _list_look_containers():
+    host = api.registered_host()
+    return [container for container in host.ls()
+            if container["loader"] == "LookLoader"]
+
+
+def _list_shading_engines(container):
+    """Return the shading engines of a look container by cbId"""
+    members = cmds.sets(container["objectName"], query=True) or []
+    shading_engines = dict()
+    for shading_engine in cmds.ls(members, type="shadingEngine"):
+        shading_engine_id = cblib.get_id(shading_engine)
+        if shading_engine_id is not None:
+            shading_engines[shading_engine_id] = shading_engine
+
+    return shading_engines
+
+
+def _split_component(member):
+    """Split "node.f[0:10]" into ("node", ".f[0:10]")"""
+    node, dot, component = member.partition(".")
+    return node, dot + component
+
+
+def capture():
+    """Capture the look assignments of the current scene
+
+    Returns:
+        dict: the snapshot data
+
+    """
+
+    containers = _list_look_containers()
+
+    # Resolve the versions of all looks at once
+    representation_ids = [io.ObjectId(container["representation"])
+                          for container in containers]
+    representations = instrumentation.find(
+        {"_id": {"$in": representation_ids}},
+        projection={"parent": True}
+    )
+    versions = dict((str(doc["_id"]), str(doc["parent"]))
+                    for doc in representations)
+
+    namespaces = defaultdict(dict)
+    for container in containers:
+        representation = str(container["representation"])
+
+        for shading_engine_id, shading_engine in _list_shading_engines(
+                container).items():
+            members = cmds.sets(shading_engine, query=True) or []
+            for member in cmds.ls(members, long=True):
+                node, component = _split_component(member)
+                node_id = cblib.get_id(node)
+                if node_id is None:
+                    continue
+
+                namespace = commands.get_namespace_from_node(node)
+                look = namespaces[namespace].setdefault(representation, {
+                    "representation": representation,
+                    "version": versions.get(representation),
+                    "shaders": defaultdict(list)
+                })
+                look["shaders"][shading_engine_id].append(node_id + component)
+
+    return {"version": SNAPSHOT_VERSION,
+            "namespaces": dict((namespace, list(looks.values()))
+                               for namespace, looks in namespaces.items())}
+
+
+def save(path):
+    """Capture the look assignments and write them to `path`"""
+
+    data = capture()
+    with open(path, "w") as f:
+        json.dump(data, f, sort_keys=True)
+
+    log.info("Saved look snapshot of %i namespaces to %s",
+             len(data["namespaces"]), path)
+
+    return data
+
+
+def _list_namespace_nodes(namespace):
+    """Return the nodes in the namespace by their cbId"""
+
+    node_ids = defaultdict(list)
+    for node in commands.list_namespace_nodes([namespace]):
+        node_id = cblib.get_id(node)
+        if node_id is not None:
+            node_ids[node_id].append(node)
+
+    return node_ids
+
+
+def replay(data):
+    """Re-apply the look assignments of a snapshot
+
+    Only namespaces which exist in the scene and looks of which the same
+    version is loaded are applied, everything else is reported.
+
+    Args:
+        data (dict): the snapshot data
+
+    Returns:
+        dict: report with the "applied", "missing_namespaces",
+            "missing_looks" and "missing_members" of the snapshot
+
+    """
+
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot version: "
+                         "%s" % data.get("version"))
+
+    # Shading engines of the loaded looks by representation
+    loaded = dict((str(container["representation"]),
+                   _list_shading_engines(container))
+                  for container in _list_look_containers())
+
+    report = {"applied": [],
+              "missing_namespaces": [],
+              "missing_looks": [],
+              "missing_members": []}
+
+    for namespace, looks in sorted(data["namespaces"].items()):
+        if namespace != ":" and not cmds.namespace(exists=namespace):
+            report["missing_namespaces"].append(namespace)
+            continue
+
+        node_ids = _list_namespace_nodes(namespace)
+        for look in looks:
+            shading_engines = loaded.get(look["representation"])
+            if shading_engines is None:
+                report["missing_looks"].append((namespace,
+                                                look["representation"]))
+                continue
+
+            # Skip the whole look when any of its shaders is missing so it
+            # is never partially applied
+            if any(shading_engine_id not in shading_engines
+                   for shading_engine_id in look["shaders"]):
+                report["missing_looks"].append((namespace,
+                                                look["representation"]))
+                continue
+
+            for shading_engine_id, members in look["shaders"].items():
+                shading_engine = shading_engines[shading_engine_id]
+
+                nodes = []
+                for member in members:
+                    node_id, component = _split_component(member)
+                    if node_id not in node_ids:
+                        report["missing_members"].append((namespace, member))
+                        continue
+                    nodes.extend(node + component
+                                 for node in node_ids[node_id])
+
+                if nodes:
+                    cmds.sets(nodes, forceElement=shading_engine)
+
+            report["applied"].append((namespace, look["version"]))
+
+    for key in ("missing_namespaces", "missing_looks", "missing_members"):
+        if report[key]:
+            log.warning("Snapshot %s: %s", key.replace("_", " "),
+                        report[key])
+
+    return report
+
+
+def load(path):
+    """Read the snapshot at `path` and replay it"""
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    return replay(data)
@@ -5,12 +5,17 @@ from avalon.vendor.Qt import QtWidgets, QtCore
 
 from avalon.tools.lib import preserve_expanded_rows, preserve_selection
 
+from . import lazy
 from . import models
 from . import commands
+from . import instrumentation
+from . import live
 from . import views
 
 from maya import cmds
 
+om = lazy.LazyModule("maya.api.OpenMaya")
+
 
 NODEROLE = QtCore.Qt.UserRole + 1
 MODELINDEX = QtCore.QModelIndex()
@@ -40,21 +45,48 @@ class AssetOutliner(QtWidgets.QWidget):
 
         from_all_asset_btn = QtWidgets.QPushButton("Get All Assets")
         from_selection_btn = QtWidgets.QPushButton("Get Assets From Selection")
+        follow_selection = QtWidgets.QCheckBox("Follow selection")
+        follow_selection.setToolTip("Update the assets whenever the "
+                                    "selection changes")
+
+        # Throttle selection changes so only the last one of a fast
+        # succession of changes gets processed
+        follow_timer = QtCore.QTimer()
+        follow_timer.setSingleShot(True)
+        follow_timer.setInterval(250)
 
         layout.addWidget(title)
         layout.addWidget(from_all_asset_btn)
         layout.addWidget(from_selection_btn)
+        layout.addWidget(follow_selection)
         layout.addWidget(view)
 
+        # Problems with the ids of the listed nodes
+        integrity = IntegrityWidget()
+        layout.addWidget(integrity)
+
         # Build connections
         from_selection_btn.clicked.connect(self.get_selected_assets)
         from_all_asset_btn.clicked.connect(self.get_all_assets)
+        follow_selection.toggled.connect(self.set_follow_selection)
+        follow_timer.timeout.connect(self.update_followed_selection)
 
         selection_model = view.selectionModel()
         selection_model.selectionChanged.connect(self.selection_changed)
 
         self.view = view
         self.model = model
+        self.integrity = integrity
+
+        self.from_all_asset_btn = from_all_asset_btn
+        self.from_selection_btn = from_selection_btn
+        self.follow_selection = follow_selection
+        self._follow_timer = follow_timer
+        self._follow_callback = None
+        self._tracker = None
+
+        # Local catalog to read assets from instead of the database
+        self.catalog = None
 
         self.setLayout(layout)
 
@@ -62,6 +94,7 @@ class AssetOutliner(QtWidgets.QWidget):
 
     def clear(self):
         self.model.clear()
+        self.integrity.clear()
 
         # fix looks remaining visible when no items present after "refresh"
         # todo: figure out why this workaround is needed.
@@ -73,6 +106,13 @@ class AssetOutliner(QtWidgets.QWidget):
         self.model.add_items(items)
         self.refreshed.emit()
 
+    def set_refresh_enabled(self, state):
+        """Toggle the actions which list the assets again"""
+        for widget in (self.from_all_asset_btn,
+                       self.from_selection_btn,
+                       self.follow_selection):
+            widget.setEnabled(state)
+
     def get_selected_items(self):
         """Get current selected items from view
 
@@ -89,41 +129,112 @@ class AssetOutliner(QtWidgets.QWidget):
     def get_all_assets(self):
         """Add all items from the current scene"""
 
+        self.follow_selection.setChecked(False)
         with preserve_expanded_rows(self.view):
             with preserve_selection(self.view):
                 self.clear()
-                nodes = commands.get_all_asset_nodes()
-                items = commands.create_items_from_nodes(nodes)
+                with instrumentation.operation("refresh all assets"):
+                    nodes = commands.get_all_asset_nodes()
+                    scan = commands.scan_id_integrity(nodes,
+                                                      catalog=self.catalog)
+                    items = commands.create_items_from_id_hash(
+                        scan["id_hashes"],
+                        catalog=self.catalog,
+                        assets=scan["assets"])
                 self.add_items(items)
+                self.integrity.set_scan(scan)
 
     def get_selected_assets(self):
         """Add all selected items from the current scene"""
 
+        self.follow_selection.setChecked(False)
         with preserve_expanded_rows(self.view):
             with preserve_selection(self.view):
                 self.clear()
-                nodes = commands.get_selected_nodes()
-                items = commands.create_items_from_nodes(nodes)
+                with instrumentation.operation("refresh selected assets"):
+                    nodes = commands.get_selected_nodes()
+                    scan = commands.scan_id_integrity(nodes,
+                                                      catalog=self.catalog)
+                    items = commands.create_items_from_id_hash(
+                        scan["id_hashes"],
+                        catalog=self.catalog,
+                        assets=scan["assets"])
                 self.add_items(items)
+                self.integrity.set_scan(scan)
+
+    def set_follow_selection(self, state):
+        """Enable or disable updating the assets on selection change"""
+
+        if self._follow_callback is not None:
+            om.MMessage.removeCallback(self._follow_callback)
+            self._follow_callback = None
+        self._follow_timer.stop()
+        self._tracker = None
+
+        if not state:
+            return
+
+        self.clear()
+        self._tracker = live.SelectionTracker(catalog=self.catalog)
+        self._follow_callback = om.MEventMessage.addEventCallback(
+            "SelectionChanged",
+            self._on_selection_changed
+        )
+        self.update_followed_selection()
+
+    def _on_selection_changed(self, *args):
+        """Callback that (re)starts the throttle on selection change"""
+        self._follow_timer.start()
+
+    def update_followed_selection(self):
+        """Patch the assets with the changes since the last selection"""
+
+        if self._tracker is None:
+            return
+
+        with instrumentation.operation("follow selection"):
+            changed, removed = self._tracker.update()
+
+        if not changed and not removed:
+            return
+
+        with preserve_expanded_rows(self.view):
+            with preserve_selection(self.view):
+                for asset_id in removed:
+                    self.model.remove_item(asset_id)
+                for item in changed:
+                    self.model.set_item(item)
+
+        # Replacing or removing rows does not emit selectionChanged
+        self.selection_changed.emit()
+        self.refreshed.emit()
+
+    def set_catalog(self, catalog):
+        """Set the local catalog to read assets from, None for the database"""
+
+        self.catalog = catalog
+        self.reset_followed_selection()
+
+    def reset_followed_selection(self):
+        """Resolve the followed selection again, e.g. after a catalog sync"""
+
+        if self._tracker is None:
+            return
+
+        self.clear()
+        self._tracker = live.SelectionTracker(catalog=self.catalog)
+        self.update_followed_selection()
 
     def get_nodes(self, selection=False):
         """Find the nodes in the current scene per asset."""
 
         items = self.get_selected_items()
 
-        # Collect all nodes by hash (optimization)
-        if not selection:
-            nodes = cmds.ls(dag=True,  long=True)
-        else:
-            nodes = commands.get_selected_nodes()
-        id_nodes = commands.create_asset_id_hash(nodes)
-
         # Collect the asset item entries per asset
         # and collect the namespaces we'd like to apply
         assets = dict()
         asset_namespaces = defaultdict(set)
         for item in items:
-            asset_id = str(item["asset"]["_id"])
             asset_name = item["asset"]["name"]
             asset_namespaces[asset_name].add(item.get("namespace"))
 
@@ -131,22 +242,27 @@ class AssetOutliner(QtWidgets.QWidget):
                 continue
 
             assets[asset_name] = item
-            assets[asset_name]["nodes"] = id_nodes.get(asset_id, [])
 
-        # Filter nodes to namespace (if only namespaces were selected)
-        for asset_name in assets:
-            namespaces = asset_namespaces[asset_name]
+        # Collect all nodes by hash (optimization). When only namespaces
+        # are selected only the nodes in those namespaces are listed.
+        namespaces = set().union(*asset_namespaces.values())
+        if selection:
+            nodes = commands.get_selected_nodes()
+        elif None in namespaces or not namespaces:
+            nodes = cmds.ls(dag=True, long=True)
+        else:
+            nodes = commands.list_namespace_nodes(namespaces)
+        id_nodes = commands.create_asset_id_hash(nodes)
 
-            # When None is present there should be no filtering
+        for asset_name, item in assets.items():
+            # When None is present there should be no filtering, else only
+            # namespaces are selected and *not* the top entry
+            namespaces = asset_namespaces[asset_name]
             if None in namespaces:
-                continue
+                namespaces = None
 
-            # Else only namespaces are selected and *not* the top entry so
-            # we should filter to only those namespaces.
-            nodes = assets[asset_name]["nodes"]
-            nodes = [node for node in nodes if
-                     commands.get_namespace_from_node(node) in namespaces]
-            assets[asset_name]["nodes"] = nodes
+            item["nodes"] = commands.get_asset_nodes(
+                id_nodes, str(item["asset"]["_id"]), namespaces)
 
         return assets
 
@@ -181,6 +297,80 @@ class AssetOutliner(QtWidgets.QWidget):
         menu.exec_(globalpos)
 
 
+class IntegrityWidget(QtWidgets.QWidget):
+    """Collapsible overview of the invalid, unknown and duplicate ids"""
+
+    Problems = [("invalid", "Invalid ids"),
+                ("missing", "Unknown asset ids"),
+                ("duplicate", "Duplicate ids")]
+
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        toggle = QtWidgets.QToolButton()
+        toggle.setStyleSheet("QToolButton { border: none; "
+                             "color: #DD5555; font-weight: bold; }")
+        toggle.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
+        toggle.setArrowType(QtCore.Qt.RightArrow)
+        toggle.setCheckable(True)
+
+        view = QtWidgets.QTreeWidget()
+        view.setHeaderLabels(["Id", "Nodes"])
+        view.setToolTip("Double click an id to select its nodes")
+        view.setColumnWidth(0, 250)
+        view.hide()
+
+        layout.addWidget(toggle)
+        layout.addWidget(view)
+
+        toggle.toggled.connect(self.on_toggled)
+        view.itemDoubleClicked.connect(self.on_item_double_clicked)
+
+        self.toggle = toggle
+        self.view = view
+
+        self.clear()
+
+    def clear(self):
+        self.view.clear()
+        self.hide()
+
+    def set_scan(self, scan):
+        """Show the problems of a `commands.scan_id_integrity` result"""
+
+        self.view.clear()
+
+        total = 0
+        for key, label in self.Problems:
+            problems = scan[key]
+            if not problems:
+                continue
+
+            parent = QtWidgets.QTreeWidgetItem(self.view, [label,
+                                                           str(len(problems))])
+            for _id, nodes in sorted(problems.items()):
+                item = QtWidgets.QTreeWidgetItem(parent, [_id,
+                                                          str(len(nodes))])
+                item.setData(0, NODEROLE, nodes)
+            total += len(problems)
+
+        self.toggle.setText("Id problems ({})".format(total))
+        self.setVisible(bool(total))
+
+    def on_toggled(self, state):
+        self.toggle.setArrowType(QtCore.Qt.DownArrow if state
+                                 else QtCore.Qt.RightArrow)
+        self.view.setVisible(state)
+
+    def on_item_double_clicked(self, item, column):
+        nodes = item.data(0, NODEROLE)
+        if nodes:
+            commands.select(nodes)
+
+
 class LookOutliner(QtWidgets.QWidget):
 
     menu_apply_action = QtCore.Signal()
@@ -0,0 +1,198 @@
+"""Benchmark resolving the nodes of selected assets in a large scene
+
+Compares the former resolution of `AssetOutliner.get_nodes`, which listed
+all nodes of the scene even when only namespace rows were selected, with
+the current one, which lists only the nodes of those namespaces. Resolving
+through `create_asset_namespace_hash` is timed as well. Both the namespace
+path and the selection path are timed.
+
+The scene and `cblib.get_id` are stand-ins so this runs without Maya:
+
+    python tests/bench_get_nodes.py --namespaces 200 --nodes 5000
+
+"""
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import standin  # noqa: E402
+
+standin.install()
+
+from mayalookassigner import commands  # noqa: E402
+
+
+class Scene(object):
+    """Stand-in scene of namespaces which each hold one asset
+
+    Args:
+        namespaces (int): number of namespaces
+        nodes (int): number of nodes per namespace
+        assets (int): number of assets the namespaces are spread over
+
+    """
+
+    def __init__(self, namespaces, nodes, assets):
+        self.asset_ids = ["%024x" % (i + 1) for i in range(assets)]
+        self.namespaces = ["asset%03d_%03d" % (i % assets, i)
+                           for i in range(namespaces)]
+        self.ids = dict()
+        self.namespace_nodes = dict()
+        for i, namespace in enumerate(self.namespaces):
+            asset_id = self.asset_ids[i % assets]
+            namespace_nodes = ["|%s:grp|%s:node%i" % (namespace, namespace, j)
+                               for j in range(nodes)]
+            self.namespace_nodes[namespace] = namespace_nodes
+            for j, node in enumerate(namespace_nodes):
+                self.ids[node] = "%s:%i" % (asset_id, j)
+
+        self.nodes = [node for namespace in self.namespaces
+                      for node in self.namespace_nodes[namespace]]
+
+    def get_id(self, node):
+        return self.ids.get(node)
+
+    def ls(self, patterns=None, dag=False, long=False):
+        if patterns is None:
+            return list(self.nodes)
+        return [node for pattern in patterns
+                for node in self.namespace_nodes[pattern[:-2]]]
+
+    def items(self, namespaces):
+        """Return the outliner items of the selected namespace rows"""
+        items = []
+        for namespace in namespaces:
+            index = self.namespaces.index(namespace)
+            asset_id = self.asset_ids[index % len(self.asset_ids)]
+            items.append({"asset": {"_id": asset_id, "name": asset_id},
+                          "namespace": namespace})
+        return items
+
+
+def group_items(items):
+    """Group the items per asset like `AssetOutliner.get_nodes`"""
+    assets = dict()
+    asset_namespaces = dict()
+    for item in items:
+        asset_name = item["asset"]["name"]
+        asset_namespaces.setdefault(asset_name, set()).add(
+            item.get("namespace"))
+        assets.setdefault(asset_name, dict(item))
+    return assets, asset_namespaces
+
+
+def resolve_old(items, nodes):
+    """The former resolution, filtering the nodes of each asset inline"""
+    assets, asset_namespaces = group_items(items)
+    id_nodes = commands.create_asset_id_hash(nodes)
+    for asset_name, item in assets.items():
+        namespaces = asset_namespaces[asset_name]
+        asset_nodes = id_nodes.get(str(item["asset"]["_id"]), [])
+        if None not in namespaces:
+            asset_nodes = [node for node in asset_nodes if
+                           commands.get_namespace_from_node(node)
+                           in namespaces]
+        item["nodes"] = asset_nodes
+    return assets
+
+
+def resolve_namespace_hash(items, nodes):
+    """Resolve through the hash per asset id and namespace"""
+    assets, asset_namespaces = group_items(items)
+    node_hash = commands.create_asset_namespace_hash(nodes)
+    for asset_name, item in assets.items():
+        namespace_nodes = node_hash.get(str(item["asset"]["_id"]), {})
+        namespaces = asset_namespaces[asset_name]
+        if None in namespaces:
+            namespaces = namespace_nodes.keys()
+        item["nodes"] = [node for namespace in namespaces
+                         for node in namespace_nodes.get(namespace, [])]
+    return assets
+
+
+def resolve_new(items, nodes):
+    """The resolution of `AssetOutliner.get_nodes`"""
+    assets, asset_namespaces = group_items(items)
+    id_nodes = commands.create_asset_id_hash(nodes)
+    for asset_name, item in assets.items():
+        namespaces = asset_namespaces[asset_name]
+        if None in namespaces:
+            namespaces = None
+        item["nodes"] = commands.get_asset_nodes(
+            id_nodes, str(item["asset"]["_id"]), namespaces)
+    return assets
+
+
+def bench(label, repeat, **variants):
+    results = dict((name, variant()) for name, variant in variants.items())
+    nodes = set(str(dict((asset_name, sorted(item["nodes"]))
+                         for asset_name, item in result.items()))
+                for result in results.values())
+    assert len(nodes) == 1, "%s: variants resolve different nodes" % label
+
+    timings = []
+    for name in ("old", "namespace_hash", "new"):
+        duration = min(timeit.repeat(variants[name], number=1,
+                                     repeat=repeat))
+        timings.append("%s %7.3fs" % (name, duration))
+    print("%-26s %s" % (label, "  ".join(timings)))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--namespaces", type=int, default=200)
+    parser.add_argument("--nodes", type=int, default=5000,
+                        help="Number of nodes per namespace")
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--selected", type=int, default=10,
+                        help="Number of selected namespace rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(args)
+
+    scene = Scene(args.namespaces, args.nodes, args.assets)
+    commands.cblib = scene
+    commands.cmds = scene
+    print("%i namespaces x %i nodes, %i assets, %i selected namespaces" % (
+        args.namespaces, args.nodes, args.assets, args.selected))
+
+    selected = scene.namespaces[::len(scene.namespaces) // args.selected]
+    selected = selected[:args.selected]
+    items = scene.items(selected)
+    asset_items = [dict(item, namespace=None) for item in items]
+
+    def list_all():
+        return scene.ls(dag=True, long=True)
+
+    def list_selected():
+        return commands.list_namespace_nodes(selected)
+
+    # Formerly all nodes were listed, even when only namespace rows were
+    # selected. Now only the nodes in those namespaces are listed.
+    bench("namespace rows", args.repeat,
+          old=lambda: resolve_old(items, list_all()),
+          namespace_hash=lambda: resolve_namespace_hash(items,
+                                                        list_selected()),
+          new=lambda: resolve_new(items, list_selected()))
+    bench("asset rows", args.repeat,
+          old=lambda: resolve_old(asset_items, list_all()),
+          namespace_hash=lambda: resolve_namespace_hash(asset_items,
+                                                        list_all()),
+          new=lambda: resolve_new(asset_items, list_all()))
+
+    # The selection path hashes the selected nodes in every variant
+    selection = [node for namespace in selected
+                 for node in scene.namespace_nodes[namespace]]
+    for label, selected_items in (("selection, namespace rows", items),
+                                  ("selection, asset rows", asset_items)):
+        bench(label, args.repeat,
+              old=lambda: resolve_old(selected_items, selection),
+              namespace_hash=lambda: resolve_namespace_hash(selected_items,
+                                                            selection),
+              new=lambda: resolve_new(selected_items, selection))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
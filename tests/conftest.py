@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import standin  # noqa: E402
+
+standin.install()
@@ -0,0 +1,134 @@
+"""Stand-ins for Maya and the database to test the tool outside of Maya
+
+Only what is needed to import the modules is installed, tests replace
+the functions they rely on with their own stand-ins.
+
+"""
+import re
+import sys
+import time
+import types
+import calendar
+import datetime
+import functools
+import itertools
+
+
+def _module(name):
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Install a `maya.cmds` stand-in when Maya is not available"""
+    try:
+        import maya.cmds  # noqa: F401
+    except ImportError:
+        maya = _module("maya")
+        maya.cmds = _module("maya.cmds")
+
+
+@functools.total_ordering
+class ObjectId(object):
+    """Stand-in for `bson.ObjectId` ordered by its creation time
+
+    Unlike bson the time is kept with sub-second precision so tests
+    don't need to wait for the clock to advance.
+
+    """
+
+    _counter = itertools.count(1)
+
+    def __init__(self, oid=None, seconds=None):
+        if isinstance(oid, ObjectId):
+            self._value = oid._value
+        elif oid is not None:
+            seconds, counter = oid.split("-")
+            self._value = (float(seconds), int(counter))
+        else:
+            seconds = time.time() if seconds is None else seconds
+            self._value = (seconds, next(self._counter))
+
+    @classmethod
+    def from_datetime(cls, value):
+        oid = cls()
+        seconds = calendar.timegm(value.utctimetuple())
+        oid._value = (seconds + value.microsecond / 1e6, 0)
+        return oid
+
+    @property
+    def generation_time(self):
+        return datetime.datetime.utcfromtimestamp(self._value[0])
+
+    def __str__(self):
+        return "%r-%i" % self._value
+
+    def __repr__(self):
+        return "ObjectId(%s)" % self
+
+    def __eq__(self, other):
+        return isinstance(other, ObjectId) and self._value == other._value
+
+    def __lt__(self, other):
+        return self._value < other._value
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+class Database(object):
+    """Stand-in for `avalon.io` serving documents from memory
+
+    Args:
+        documents (list): the documents in the project's collection
+
+    """
+
+    InvalidId = ValueError
+
+    @staticmethod
+    def ObjectId(value):
+        # Hexadecimal ids are stored lowercase like bson does
+        return str(value).lower()
+
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+
+    def _matches(self, document, query):
+        for key, value in query.items():
+            if key == "$or":
+                if not any(self._matches(document, q) for q in value):
+                    return False
+            elif isinstance(value, dict):
+                if not self._matches_operators(document.get(key), value):
+                    return False
+            elif document.get(key) != value:
+                return False
+        return True
+
+    def _matches_operators(self, field, operators):
+        for operator, value in operators.items():
+            if field is None:
+                return False
+            if operator == "$in" and field not in value:
+                return False
+            if operator == "$lt" and not field < value:
+                return False
+            if operator == "$gte" and field < value:
+                return False
+            if operator == "$regex" and not re.match(value, field):
+                return False
+        return True
+
+    def find(self, query, projection=None, sort=None):
+        found = [doc for doc in self.documents if self._matches(doc, query)]
+        for key, direction in reversed(sort or []):
+            found.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return iter(found)
+
+    def find_one(self, query, projection=None, sort=None):
+        return next(self.find(query, projection=projection, sort=sort), None)
+
+    def list_looks(self, asset_id):
+        return list(self.find({"type": "subset", "parent": asset_id}))
@@ -0,0 +1,116 @@
+"""Incremental sync of the offline catalog against a stand-in database"""
+import pytest
+
+import standin
+
+from mayalookassigner import catalog
+from mayalookassigner import instrumentation
+
+
+def publish(database, asset_id, seconds=None, name="lookDefault"):
+    """Publish a subset with one version for the asset"""
+    ObjectId = standin.ObjectId
+    subset = {"_id": ObjectId(seconds=seconds), "type": "subset",
+              "parent": asset_id, "name": name}
+    version = {"_id": ObjectId(seconds=seconds), "type": "version",
+               "parent": subset["_id"], "name": 1}
+    database.documents.extend([subset, version])
+    return subset, version
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = standin.Database()
+    database.ObjectId = standin.ObjectId
+    monkeypatch.setattr(instrumentation, "io", database)
+    monkeypatch.setattr(catalog, "io", database)
+    return database
+
+
+@pytest.fixture
+def look_catalog(tmpdir):
+    look_catalog = catalog.Catalog(str(tmpdir.join("catalog.db")))
+    yield look_catalog
+    look_catalog.close()
+
+
+def test_sync_fetches_looks_and_versions(database, look_catalog):
+    asset = {"_id": standin.ObjectId(), "type": "asset", "name": "tree"}
+    database.documents.append(asset)
+    subset, version = publish(database, asset["_id"])
+
+    look_catalog.sync()
+
+    assert look_catalog.find_assets([asset["_id"]])[0]["name"] == "tree"
+    looks = look_catalog.list_looks(asset["_id"])
+    assert [look["name"] for look in looks] == ["lookDefault"]
+    latest = look_catalog.find_latest_version(subset["_id"])
+    assert latest["_id"] == version["_id"]
+
+
+def test_sync_only_queries_look_versions(database, look_catalog):
+    asset = {"_id": standin.ObjectId(), "type": "asset", "name": "tree"}
+    database.documents.append(asset)
+    publish(database, asset["_id"], name="modelDefault")
+    look_catalog.sync()
+
+    subset, version = publish(database, asset["_id"])
+
+    fetched = []
+    find = database.find
+
+    def find_and_record(query, **kwargs):
+        result = list(find(query, **kwargs))
+        fetched.extend(result)
+        return iter(result)
+
+    database.find = find_and_record
+    look_catalog.sync(full=True)
+    database.find = find
+
+    versions = [doc["_id"] for doc in fetched if doc["type"] == "version"]
+    assert versions == [version["_id"]]
+
+
+def test_publish_during_sync_is_fetched_next_sync(database, look_catalog):
+    asset = {"_id": standin.ObjectId(), "type": "asset", "name": "tree"}
+    database.documents.append(asset)
+
+    # Publish a look in between the asset and the version query
+    published = []
+    find = database.find
+
+    def find_and_publish(query, **kwargs):
+        result = list(find(query, **kwargs))
+        if not published:
+            published.extend(publish(database, asset["_id"]))
+        return iter(result)
+
+    database.find = find_and_publish
+    look_catalog.sync()
+    database.find = find
+
+    subset, version = published
+    assert not look_catalog.list_looks(asset["_id"])
+
+    look_catalog.sync()
+
+    latest = look_catalog.find_latest_version(subset["_id"])
+    assert latest["_id"] == version["_id"]
+
+
+def test_sync_fetches_lagging_publishes(database, look_catalog):
+    asset = {"_id": standin.ObjectId(), "type": "asset", "name": "tree"}
+    database.documents.append(asset)
+    look_catalog.sync()
+
+    # A publisher whose clock lags behind within the overlap
+    lagging = asset["_id"].generation_time
+    seconds = (lagging - lagging.utcfromtimestamp(0)).total_seconds()
+    subset, version = publish(database, asset["_id"],
+                              seconds=seconds - catalog.OVERLAP / 2.0)
+
+    look_catalog.sync()
+
+    latest = look_catalog.find_latest_version(subset["_id"])
+    assert latest["_id"] == version["_id"]
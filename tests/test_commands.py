@@ -0,0 +1,166 @@
+"""Scene helpers against stand-in nodes and a stand-in database"""
+import fnmatch
+
+import pytest
+
+import standin
+
+from mayalookassigner import rules
+from mayalookassigner import commands
+from mayalookassigner import instrumentation
+
+
+ASSET = "%024x" % 0xa1
+UNKNOWN = "%024x" % 0xa2
+LOOK = "%024x" % 0xb1
+
+
+class Cmds(object):
+    """Stand-in for the `maya.cmds` calls of the scene helpers
+
+    Args:
+        nodes (list): long names of the dag nodes in the scene
+        instances (dict): instanced paths mapped to the path of the node
+            they share
+
+    """
+
+    def __init__(self, nodes=None, instances=None):
+        self.nodes = nodes or []
+        self.instances = instances or {}
+
+    def ls(self, patterns=None, uuid=False, dag=False, long=False):
+        if uuid:
+            return [self.instances.get(node, node) for node in patterns]
+
+        assert dag and long
+        if patterns is None:
+            return list(self.nodes)
+
+        # Matching nodes are listed together with their dag descendants
+        matches = [node for node in self.nodes
+                   if any(fnmatch.fnmatchcase(node.rsplit("|", 1)[-1], pattern)
+                          for pattern in patterns)]
+        return [node for node in self.nodes
+                if any(node == match or node.startswith(match + "|")
+                       for match in matches)]
+
+
+@pytest.fixture
+def scene(monkeypatch):
+    """Return the node to cbId mapping of the stand-in scene"""
+
+    database = standin.Database([{"_id": ASSET, "type": "asset",
+                                  "name": "tree"},
+                                 {"_id": LOOK, "type": "subset",
+                                  "parent": ASSET, "name": "lookDefault"}])
+    ids = dict()
+
+    class Lib(object):
+        list_looks = staticmethod(database.list_looks)
+        get_id = staticmethod(ids.get)
+
+    monkeypatch.setattr(instrumentation, "io", database)
+    monkeypatch.setattr(instrumentation, "cblib", Lib)
+    monkeypatch.setattr(commands, "io", database)
+    monkeypatch.setattr(commands, "cblib", Lib)
+    monkeypatch.setattr(commands, "cmds", Cmds())
+
+    return ids
+
+
+def test_scan_groups_problems(scene):
+    scene.update({"|a:geo": ASSET + ":1",
+                  "|a:geo1": ASSET + ":2",
+                  "|a:geo2": ASSET + ":2",
+                  "|b:geo": UNKNOWN + ":1",
+                  "|c:geo": "notanid:1"})
+
+    scan = commands.scan_id_integrity(sorted(scene))
+
+    assert list(scan["assets"]) == [ASSET]
+    assert scan["id_hashes"] == {ASSET: ["|a:geo", "|a:geo1", "|a:geo2"]}
+    assert scan["missing"] == {UNKNOWN: ["|b:geo"]}
+    assert scan["invalid"] == {"notanid": ["|c:geo"]}
+    assert scan["duplicate"] == {ASSET + ":2": ["|a:geo1", "|a:geo2"]}
+
+
+def test_scan_merges_duplicates_of_all_namespaces(scene):
+    nodes = ["|a:geo", "|a:geo1", "|b:geo", "|b:geo1", "|c:geo"]
+    scene.update((node, ASSET + ":1") for node in nodes)
+
+    scan = commands.scan_id_integrity(nodes)
+
+    # The single node in namespace c is no duplicate
+    assert scan["duplicate"] == {ASSET + ":1": nodes[:4]}
+
+
+def test_scan_ignores_instances(scene, monkeypatch):
+    nodes = ["|a:grp|a:geo", "|a:grp1|a:geo"]
+    scene.update((node, ASSET + ":1") for node in nodes)
+    monkeypatch.setattr(commands, "cmds",
+                        Cmds(instances={nodes[1]: nodes[0]}))
+
+    scan = commands.scan_id_integrity(nodes)
+
+    assert not scan["duplicate"]
+
+
+def test_scan_accepts_uppercase_ids(scene):
+    scene["|a:geo"] = ASSET.upper() + ":1"
+
+    scan = commands.scan_id_integrity(["|a:geo"])
+
+    assert not scan["invalid"]
+    assert not scan["missing"]
+    items = commands.create_items_from_id_hash(scan["id_hashes"],
+                                               assets=scan["assets"])
+    assert [item["label"] for item in items] == ["tree"]
+
+
+def test_uppercase_ids_resolve_nodes(scene):
+    scene.update({"|a:geo": ASSET.upper() + ":1",
+                  "|b:geo": ASSET + ":2"})
+    nodes = sorted(scene)
+
+    items = commands.create_items_from_nodes(nodes)
+    assert [item["label"] for item in items] == ["tree"]
+
+    # The nodes are looked up by the id of the asset document
+    asset_id = str(items[0]["asset"]["_id"])
+    id_hash = commands.create_asset_id_hash(nodes)
+    assert commands.get_asset_nodes(id_hash, asset_id) == nodes
+    assert commands.get_asset_nodes(id_hash, asset_id, {"a"}) == ["|a:geo"]
+
+
+def test_uppercase_ids_are_planned_by_rules(scene):
+    scene.update({"|a:geo": ASSET.upper() + ":1",
+                  "|b:geo": ASSET + ":1"})
+
+    assets = commands.create_items_per_namespace(sorted(scene))
+    plan = rules.RuleSet([rules.Rule("*", "lookDefault")]).plan(assets)
+
+    assert len(plan) == 1
+    assert plan[0]["namespaces"] == ["a", "b"]
+    assert plan[0]["nodes"] == ["|a:geo", "|b:geo"]
+
+
+@pytest.mark.parametrize("namespaces, expected", [
+    (["a"], ["|a:grp", "|a:grp|a:geo"]),
+    (["b"], ["|a:grp|b:geo", "|b:geo"]),
+    ([":"], ["|geo"]),
+    ([":", "a"], ["|a:grp", "|a:grp|a:geo", "|geo"]),
+])
+def test_list_namespace_nodes(namespaces, expected, monkeypatch):
+    nodes = ["|a:grp", "|a:grp|a:geo", "|a:grp|b:geo", "|b:geo", "|geo"]
+    monkeypatch.setattr(commands, "cmds", Cmds(nodes))
+
+    assert sorted(commands.list_namespace_nodes(namespaces)) == expected
+
+
+def test_get_asset_nodes():
+    id_hash = {ASSET: ["|a:geo", "|b:geo"]}
+
+    assert commands.get_asset_nodes(id_hash, ASSET) == ["|a:geo", "|b:geo"]
+    assert commands.get_asset_nodes(id_hash, ASSET, {"b"}) == ["|b:geo"]
+    assert commands.get_asset_nodes(id_hash, UNKNOWN) == []
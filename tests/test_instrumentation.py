@@ -0,0 +1,117 @@
+"""Query budgets of the tool's operations against a stand-in database"""
+import pytest
+
+import standin
+
+from mayalookassigner import commands
+from mayalookassigner import instrumentation
+
+
+ASSETS = ["%024x" % i for i in range(1, 6)]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    documents = []
+    for asset_id in ASSETS:
+        documents.append({"_id": asset_id, "type": "asset",
+                          "name": "asset%s" % asset_id[-1]})
+        subset_id = asset_id + "_look"
+        documents.append({"_id": subset_id, "type": "subset",
+                          "parent": asset_id, "name": "lookDefault"})
+        for version in (1, 2):
+            documents.append({"_id": "%s_v%i" % (subset_id, version),
+                              "type": "version",
+                              "parent": subset_id,
+                              "name": version})
+
+    database = standin.Database(documents)
+    database.assigned = []
+
+    class Lib(object):
+        list_looks = staticmethod(database.list_looks)
+
+        @staticmethod
+        def assign_look_by_version(nodes, version_id):
+            database.assigned.append((nodes, version_id))
+
+        @staticmethod
+        def get_id(node):
+            return node.rsplit("|", 1)[-1].split("__", 1)[-1] or None
+
+    monkeypatch.setattr(instrumentation, "io", database)
+    monkeypatch.setattr(instrumentation, "cblib", Lib)
+    monkeypatch.setattr(commands, "io", database)
+    monkeypatch.setattr(commands, "cblib", Lib)
+
+    return database
+
+
+def make_nodes(asset_ids, namespaces=3):
+    """Return node paths which carry their cbId in their name"""
+    return ["|ns%i:geo__%s:node" % (i, asset_id)
+            for asset_id in asset_ids
+            for i in range(namespaces)]
+
+
+def test_refresh_assets_within_budget(database):
+    nodes = make_nodes(ASSETS)
+
+    # One query for all assets and one list_looks per asset
+    with instrumentation.query_budget(1 + len(ASSETS),
+                                      name="refresh all assets") as stats:
+        items = commands.create_items_from_nodes(nodes)
+
+    assert len(items) == len(ASSETS)
+    assert stats.by_shape()[("find", "{_id: {$in: [?]}}")]["count"] == 1
+
+
+def test_refresh_skips_unknown_ids_without_queries(database):
+    nodes = make_nodes(ASSETS + ["invalid", "%024x" % 99])
+
+    with instrumentation.query_budget(1 + len(ASSETS)):
+        items = commands.create_items_from_nodes(nodes)
+
+    assert len(items) == len(ASSETS)
+
+
+def test_assign_looks_within_budget(database):
+    nodes = make_nodes(ASSETS)
+    items = commands.create_items_from_nodes(nodes)
+    id_hash = commands.create_asset_id_hash(nodes)
+
+    # One version lookup per assigned asset
+    with instrumentation.query_budget(len(items), name="assign looks"):
+        for item in items:
+            asset_nodes = commands.get_asset_nodes(
+                id_hash, str(item["asset"]["_id"]))
+            commands.assign_latest_version(item["looks"][0]["_id"],
+                                           asset_nodes)
+
+    assert len(database.assigned) == len(ASSETS)
+    assert all(version_id.endswith("_v2")
+               for nodes, version_id in database.assigned)
+    assert sorted(node for nodes, version_id in database.assigned
+                  for node in nodes) == sorted(nodes)
+
+
+def test_exceeding_budget_raises(database):
+    with pytest.raises(instrumentation.QueryBudgetExceeded):
+        with instrumentation.query_budget(len(ASSETS)):
+            commands.create_items_from_nodes(make_nodes(ASSETS))
+
+
+def test_nested_operations_record_queries(database):
+    with instrumentation.operation("outer") as outer:
+        with instrumentation.operation("inner") as inner:
+            commands.get_latest_version(ASSETS[0] + "_look")
+        commands.get_latest_version(ASSETS[1] + "_look")
+
+    assert inner.count == 1
+    assert outer.count == 2
+
+
+def test_shape_strips_values():
+    shape = instrumentation.get_shape({"type": "version",
+                                       "parent": {"$in": [1, 2]}})
+    assert shape == "{parent: {$in: [?]}, type: ?}"
@@ -0,0 +1,99 @@
+"""Follow a stand-in selection with the selection tracker"""
+import pytest
+
+import standin
+
+from mayalookassigner import live
+from mayalookassigner import commands
+from mayalookassigner import instrumentation
+
+
+TREE = "%024x" % 0xa1
+ROCK = "%024x" % 0xa2
+
+
+class Cmds(object):
+    """Stand-in for `cmds.listRelatives` which counts its calls
+
+    Args:
+        nodes (list): long names of the dag nodes in the scene
+
+    """
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.calls = 0
+
+    def listRelatives(self, parents, fullPath=False):
+        assert fullPath
+        self.calls += 1
+        return [node for node in self.nodes
+                if node.rsplit("|", 1)[0] in parents] or None
+
+
+@pytest.fixture
+def scene(monkeypatch):
+    database = standin.Database([{"_id": TREE, "type": "asset",
+                                  "name": "tree"},
+                                 {"_id": ROCK, "type": "asset",
+                                  "name": "rock"}])
+    ids = {"|tree01:grp|tree01:geo": TREE.upper() + ":1",
+           "|tree02:grp|tree02:geo": TREE + ":1",
+           "|rock01:grp|rock01:mid|rock01:geo": ROCK + ":1"}
+
+    class Lib(object):
+        list_looks = staticmethod(database.list_looks)
+        get_id = staticmethod(ids.get)
+
+    cmds = Cmds(["|tree01:grp", "|tree01:grp|tree01:geo",
+                 "|tree02:grp", "|tree02:grp|tree02:geo",
+                 "|rock01:grp", "|rock01:grp|rock01:mid",
+                 "|rock01:grp|rock01:mid|rock01:geo"])
+
+    monkeypatch.setattr(instrumentation, "io", database)
+    monkeypatch.setattr(instrumentation, "cblib", Lib)
+    monkeypatch.setattr(commands, "io", database)
+    monkeypatch.setattr(commands, "cblib", Lib)
+    monkeypatch.setattr(commands, "cmds", cmds)
+
+    return cmds
+
+
+def summarize(changed):
+    return dict((item["label"], sorted(item["namespaces"]))
+                for item in changed)
+
+
+def test_added_roots_are_listed_in_one_batch(scene):
+    tracker = live.SelectionTracker()
+
+    changed, removed = tracker.update(["|tree01:grp", "|tree02:grp",
+                                       "|rock01:grp"])
+
+    assert summarize(changed) == {"tree": ["tree01", "tree02"],
+                                  "rock": ["rock01"]}
+    assert not removed
+
+    # One call per level of the deepest hierarchy plus the empty level
+    assert scene.calls == 3
+
+
+def test_nested_roots_keep_their_nodes(scene):
+    tracker = live.SelectionTracker()
+    tracker.update(["|rock01:grp", "|rock01:grp|rock01:mid"])
+
+    changed, removed = tracker.update(["|rock01:grp|rock01:mid"])
+    assert not changed and not removed
+
+    changed, removed = tracker.update([])
+    assert removed == [ROCK]
+
+
+def test_removed_roots_remove_assets(scene):
+    tracker = live.SelectionTracker()
+    tracker.update(["|tree01:grp", "|rock01:grp"])
+
+    changed, removed = tracker.update(["|tree01:grp"])
+
+    assert not changed
+    assert removed == [ROCK]
@@ -0,0 +1,46 @@
+"""Import the package without its interface"""
+import sys
+import types
+
+import pytest
+
+import mayalookassigner
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Stand-in for the interface module, which needs Maya and Qt"""
+
+    module = types.ModuleType("mayalookassigner.app")
+
+    class App(object):
+        pass
+
+    module.App = App
+    monkeypatch.setitem(sys.modules, "mayalookassigner.app", module)
+    monkeypatch.setattr(mayalookassigner, "app", module, raising=False)
+    return module
+
+
+def test_package_does_not_import_interface():
+    assert "mayalookassigner.app" not in sys.modules
+    assert sys.modules["mayalookassigner"] is mayalookassigner
+
+
+def test_app_is_importable(app):
+    from mayalookassigner import App
+
+    assert App is app.App
+
+
+def test_star_import_resolves_all(app):
+    namespace = {}
+    exec("from mayalookassigner import *", namespace)
+
+    assert namespace["App"] is app.App
+    assert namespace["show"] is mayalookassigner.show
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        mayalookassigner.Unknown
@@ -0,0 +1,99 @@
+"""Evaluate rule sets against a stand-in scene without Maya"""
+import pytest
+
+from mayalookassigner import rules
+
+
+def make_asset(_id, name, looks, namespaces):
+    return {"asset": {"_id": _id, "name": name},
+            "looks": [{"_id": "%s_%s" % (_id, look), "name": look}
+                      for look in looks],
+            "namespaces": namespaces}
+
+
+@pytest.fixture
+def scene():
+    return [
+        make_asset("tree", "tree", ["lookAutumn", "lookDefault"], {
+            "tree_01": ["|tree_01:geo"],
+            "tree_02": ["|tree_02:geo"],
+            "treehouse_big": ["|treehouse_big:geo"],
+        }),
+        make_asset("rock", "rock", ["lookDefault"], {
+            "rock01": ["|rock01:geo"],
+            ":": ["|rock_geo"],
+        }),
+    ]
+
+
+def test_plan_merges_namespaces_per_look(scene):
+    ruleset = rules.RuleSet([
+        rules.Rule("tree_*", "lookAutumn", field="namespace"),
+        rules.Rule("*", "lookDefault", priority=-1),
+    ])
+
+    plan = ruleset.plan(scene)
+
+    summary = sorted((entry["asset"]["name"], entry["look"]["name"],
+                      tuple(entry["namespaces"])) for entry in plan)
+    assert summary == [
+        ("rock", "lookDefault", (":", "rock01")),
+        ("tree", "lookAutumn", ("tree_01", "tree_02")),
+        ("tree", "lookDefault", ("treehouse_big",)),
+    ]
+
+    autumn = next(entry for entry in plan
+                  if entry["look"]["name"] == "lookAutumn")
+    assert autumn["nodes"] == ["|tree_01:geo", "|tree_02:geo"]
+
+
+def test_priority_before_order(scene):
+    ruleset = rules.RuleSet([
+        rules.Rule("*", "lookDefault"),
+        rules.Rule("tree_01", "lookAutumn", field="namespace", priority=10),
+    ])
+
+    plan = ruleset.plan(scene)
+
+    autumn = [entry for entry in plan
+              if entry["look"]["name"] == "lookAutumn"]
+    assert len(autumn) == 1
+    assert autumn[0]["namespaces"] == ["tree_01"]
+
+
+def test_rule_skipped_when_look_is_missing(scene):
+    ruleset = rules.RuleSet([rules.Rule("*", "lookAutumn")])
+
+    plan = ruleset.plan(scene)
+
+    assert [entry["asset"]["name"] for entry in plan] == ["tree"]
+
+
+@pytest.mark.parametrize("syntax, pattern", [("glob", "tree"),
+                                             ("regex", "tree"),
+                                             ("regex", "tree|rock")])
+def test_patterns_match_full_name(syntax, pattern):
+    rule = rules.Rule(pattern, "lookDefault", field="namespace",
+                      syntax=syntax)
+
+    assert rule.match("tree", "tree")
+    assert not rule.match("tree", "treehouse_big")
+
+
+def test_save_and_load(tmpdir):
+    path = str(tmpdir.join("rules.json"))
+    ruleset = rules.RuleSet([
+        rules.Rule("^rock\\d+$", "lookDefault", field="namespace",
+                   syntax="regex", priority=5),
+        rules.Rule("tree_*", "lookAutumn", field="namespace"),
+    ])
+
+    ruleset.save(path)
+    loaded = rules.RuleSet.load(path)
+
+    assert loaded.to_data() == ruleset.to_data()
+
+
+def test_invalid_rule():
+    with pytest.raises(ValueError):
+        rules.Rule("*", "lookDefault", field="subset")